@@ -1,7 +1,5 @@
 
 import streamlit as st
-import plotly.graph_objects as go
-import numpy as np
 
 st.set_page_config(page_title="QuLab", layout="wide")
 st.sidebar.image("https://www.quantuniversity.com/assets/img/logo5.jpg")
@@ -28,16 +26,32 @@ We'll simulate GBM paths, visualize them, and analyze their properties across di
 
 # Your code starts here
 page = st.sidebar.selectbox(label="Navigation", options=["GBM Simulation", "Parameter Analysis", "Option Pricing"])
-
-if page == "GBM Simulation":
-    from application_pages.gbm_simulation import run_gbm_simulation
-    run_gbm_simulation()
-elif page == "Parameter Analysis":
-    from application_pages.parameter_analysis import run_parameter_analysis
-    run_parameter_analysis()
-elif page == "Option Pricing":
-    from application_pages.option_pricing import run_option_pricing
-    run_option_pricing()
+show_debug_panel = st.sidebar.checkbox("Show performance debug panel", value=False)
+
+from application_pages.instrumentation import finish_page_run, render_debug_panel, start_page_run
+
+start_page_run(page)
+try:
+    if page == "GBM Simulation":
+        from application_pages.gbm_simulation import run_gbm_simulation
+        run_gbm_simulation()
+    elif page == "Parameter Analysis":
+        from application_pages.parameter_analysis import run_parameter_analysis
+        run_parameter_analysis()
+    elif page == "Option Pricing":
+        from application_pages.option_pricing import run_option_pricing
+        run_option_pricing()
+finally:
+    run = finish_page_run()
+
+if show_debug_panel:
+    render_debug_panel(run)
+
+# Once per process, after the first page has rendered, import the remaining
+# pages and pre-fill their caches in the background.
+from application_pages.startup import start_background_warmup
+
+start_background_warmup()
 # Your code ends
 
 st.divider()
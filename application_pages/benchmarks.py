@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy
+from scipy import stats
+from application_pages.black_scholes import black_scholes_call, black_scholes_chain, black_scholes_put
+from application_pages.fused_kernels import NUMBA_VERSION, default_backend
+from application_pages.gbm_engine import simulate_gbm
+from application_pages.gbm_streaming import stream_gbm_statistics
+from application_pages.implied_vol import implied_volatility
+from application_pages.mc_pricing import price_option_mc
+from application_pages.multi_asset import constant_correlation, price_basket_option
+
+# Headless benchmarks for the simulation and pricing kernels. Run with
+#   python -m application_pages.benchmarks --output bench.json
+# and gate a new image on
+#   python -m application_pages.benchmarks --compare bench.json
+
+GRIDS = {
+    "quick": {
+        "gbm_paths": (100, 1000),
+        "gbm_steps": (100, 1000),
+        "stream_paths": (100_000,),
+        "chain_sizes": (1_000, 100_000),
+        "mc_paths": (10_000,),
+        "fused_paths": (100_000,),
+    },
+    "full": {
+        "gbm_paths": (100, 1000, 10_000),
+        "gbm_steps": (100, 1000, 10_000),
+        "stream_paths": (100_000, 1_000_000),
+        "chain_sizes": (1_000, 10_000, 100_000, 1_000_000),
+        "mc_paths": (10_000, 100_000),
+        "fused_paths": (100_000, 10_000_000),
+    },
+}
+
+def _random_chain(n, seed=0):
+    rng = np.random.default_rng(seed)
+    S = np.full(n, 100.0)
+    K = rng.uniform(60, 160, n)
+    T = rng.uniform(0.05, 2.0, n)
+    sigma = rng.uniform(0.1, 0.6, n)
+    return S, K, T, 0.03, sigma
+
+def benchmark_cases(grid):
+    # Each case is (name, params, setup, work units, unit). setup() returns the
+    # zero-argument callable that is timed, so input generation is excluded.
+    cases = []
+    for paths in grid["gbm_paths"]:
+        for steps in grid["gbm_steps"]:
+            params = dict(num_paths=paths, num_steps=steps)
+            setup = lambda paths=paths, steps=steps: (
+                lambda: simulate_gbm(100.0, 0.05, 0.2, 1.0, 1.0 / steps, paths, rng=np.random.default_rng(0)))
+            cases.append(("gbm_simulate", params, setup, paths * steps, "path_steps/s"))
+
+    for paths in grid["stream_paths"]:
+        params = dict(num_paths=paths, num_steps=100)
+        setup = lambda paths=paths: (lambda: stream_gbm_statistics(100.0, 0.05, 0.2, 1.0, 0.01, paths, seed=0))
+        cases.append(("gbm_stream_stats", params, setup, paths * 100, "path_steps/s"))
+
+    for n in grid["chain_sizes"]:
+        def setup_chain(n=n):
+            chain = _random_chain(n)
+            return lambda: black_scholes_chain(*chain)
+        cases.append(("bs_chain_greeks", dict(contracts=n), setup_chain, n, "contracts/s"))
+
+        def setup_iv(n=n):
+            S, K, T, r, sigma = _random_chain(n)
+            prices = black_scholes_chain(S, K, T, r, sigma).call
+            return lambda: implied_volatility(prices, S, K, T, r)
+        cases.append(("implied_vol_chain", dict(contracts=n), setup_iv, n, "contracts/s"))
+
+    # The scalar kernels as the option page originally called them, one price at a time.
+    def setup_scalar():
+        stock_prices = np.linspace(50, 150, 100)
+        return lambda: ([black_scholes_call(s, 100, 1, 0.05, 0.2) for s in stock_prices],
+                        [black_scholes_put(s, 100, 1, 0.05, 0.2) for s in stock_prices])
+    cases.append(("bs_scalar_loop", dict(contracts=100), setup_scalar, 200, "contracts/s"))
+
+    for paths in grid["mc_paths"]:
+        for style in ("european", "asian"):
+            params = dict(num_paths=paths, num_steps=100, style=style)
+            setup = lambda paths=paths, style=style: (
+                lambda: price_option_mc(100, 100, 1, 0.05, 0.2, style=style, num_paths=paths, seed=0,
+                                        antithetic=True, control_variate=True))
+            cases.append(("mc_price", params, setup, paths * 100, "path_steps/s"))
+
+    # Daily barrier monitoring: a daily grid for every path versus a coarse
+    # grid with Brownian-bridge draws on the daily dates only near the barrier.
+    for paths in grid["mc_paths"]:
+        for dt, monitoring_dt in ((1 / 256, None), (1 / 8, 1 / 256)):
+            params = dict(num_paths=paths, dt=dt, monitoring_dt=monitoring_dt)
+            setup = lambda paths=paths, dt=dt, monitoring_dt=monitoring_dt: (
+                lambda: price_option_mc(100, 100, 1, 0.05, 0.2, style="barrier", barrier=90, dt=dt,
+                                        num_paths=paths, seed=0, monitoring_dt=monitoring_dt))
+            cases.append(("mc_barrier_daily", params, setup, paths * 256, "path_days/s"))
+
+    # 50-name basket: one correlated terminal draw per path through the cached Cholesky factor.
+    for paths in grid["mc_paths"]:
+        def setup_basket(paths=paths, num_assets=50):
+            corr = constant_correlation(num_assets, 0.3)
+            weights = np.full(num_assets, 1.0 / num_assets)
+            return lambda: price_basket_option(100.0, 0.25, corr, weights, 100.0, 1.0, 0.03, num_paths=paths, seed=0)
+        cases.append(("basket_price", dict(num_paths=paths, num_assets=50), setup_basket, paths * 50, "asset_draws/s"))
+
+    for paths in grid["fused_paths"]:
+        for style in ("asian", "barrier"):
+            params = dict(num_paths=paths, num_steps=100, style=style, backend=default_backend())
+            setup = lambda paths=paths, style=style: (
+                lambda: price_option_mc(100, 100, 1, 0.05, 0.2, style=style, barrier=80, num_paths=paths, seed=0,
+                                        antithetic=True, control_variate=True, backend="fused"))
+            cases.append(("mc_price_fused", params, setup, paths * 100, "path_steps/s"))
+
+    # The per-rerun SciPy work of the distribution pages at their default inputs.
+    def setup_binomial():
+        x = np.arange(0, 21)
+        return lambda: (stats.binom.pmf(x, 20, 0.5), stats.binom.pmf(10, 20, 0.5),
+                        stats.binom.cdf(10, 20, 0.5), 1 - stats.binom.cdf(9, 20, 0.5))
+    cases.append(("binomial_page_scipy", dict(n=20), setup_binomial, 1, "reruns/s"))
+
+    def setup_poisson():
+        x = np.arange(0, 16)
+        return lambda: (stats.poisson.pmf(x, 5.0), stats.poisson.pmf(5, 5.0),
+                        stats.poisson.cdf(5, 5.0), 1 - stats.poisson.cdf(4, 5.0))
+    cases.append(("poisson_page_scipy", dict(lam=5.0), setup_poisson, 1, "reruns/s"))
+
+    def setup_normal():
+        x = np.linspace(-4, 4, 1000)
+        return lambda: (stats.norm.pdf(x, 0, 1), stats.norm.cdf(1.0))
+    cases.append(("normal_page_scipy", dict(points=1000), setup_normal, 1, "reruns/s"))
+    return cases
+
+def run_case(func, repeat, min_time=0.2):
+    # Best-of-N wall time; peak memory comes from a separate traced run so
+    # tracemalloc overhead does not leak into the timings.
+    func()
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < repeat or (time.perf_counter() - start < min_time and len(timings) < 100 * repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), float(np.median(timings)), peak, len(timings)
+
+def case_key(result):
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+def run_benchmarks(grid="quick", repeat=3, only=None, log=print):
+    results = []
+    for name, params, setup, units, unit in benchmark_cases(GRIDS[grid]):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        best, median, peak, runs = run_case(setup(), repeat)
+        result = {
+            "name": name,
+            "params": params,
+            "wall_time_s": best,
+            "median_time_s": median,
+            "runs": runs,
+            "peak_memory_bytes": peak,
+            "throughput": units / best if best > 0 else float("inf"),
+            "throughput_unit": unit,
+        }
+        results.append(result)
+        if log:
+            log(format_result(result))
+    return {"metadata": environment_metadata(grid, repeat), "results": results}
+
+def environment_metadata(grid, repeat):
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "grid": grid,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "numba": NUMBA_VERSION,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def format_result(result):
+    params = ", ".join(f"{k}={v}" for k, v in result["params"].items())
+    return (f"{result['name']:<22} {params:<42} {result['wall_time_s'] * 1e3:10.3f} ms "
+            f"{result['peak_memory_bytes'] / 1024**2:9.2f} MiB {result['throughput']:14.4g} {result['throughput_unit']}")
+
+def compare_results(current, baseline, tolerance=0.25, memory_tolerance=0.10):
+    # A case regresses if it got slower by more than `tolerance` or its peak
+    # memory grew by more than `memory_tolerance` (both relative).
+    base = {case_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        previous = base.get(case_key(result))
+        if previous is None:
+            continue
+        time_ratio = result["wall_time_s"] / previous["wall_time_s"] if previous["wall_time_s"] > 0 else 1.0
+        mem_ratio = (result["peak_memory_bytes"] / previous["peak_memory_bytes"]
+                     if previous["peak_memory_bytes"] > 0 else 1.0)
+        regressed = time_ratio > 1 + tolerance or mem_ratio > 1 + memory_tolerance
+        rows.append(dict(name=result["name"], params=result["params"], time_ratio=time_ratio,
+                         memory_ratio=mem_ratio, regressed=regressed))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GBM simulation and option pricing kernels.")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="quick")
+    parser.add_argument("--repeat", type=int, default=3, help="minimum timed runs per case (best is reported)")
+    parser.add_argument("--only", nargs="*", help="run only cases whose name contains one of these strings")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="allowed relative peak-memory growth")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.grid, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Wrote {len(current['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare_results(current, baseline, args.tolerance, args.memory_tolerance)
+        for row in rows:
+            flag = "REGRESSION" if row["regressed"] else "ok"
+            params = ", ".join(f"{k}={v}" for k, v in row["params"].items())
+            print(f"{flag:<10} {row['name']:<22} {params:<42} time x{row['time_ratio']:.2f}  memory x{row['memory_ratio']:.2f}")
+        if any(row["regressed"] for row in rows):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
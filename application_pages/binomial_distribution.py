@@ -2,7 +2,8 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
-from scipy import stats
+from application_pages.distribution_tables import cached_binomial_table
+from application_pages.instrumentation import stage
 
 def run_binomial_distribution():
     st.header("Binomial Distribution")
@@ -27,12 +28,14 @@ def run_binomial_distribution():
     col1, col2 = st.columns(2)
     
     with col1:
-        n = st.slider("Number of trials (n)", 1, 100, 20)
+        n = st.slider("Number of trials (n)", 1, 10_000, 20)
     with col2:
         p = st.slider("Probability of success (p)", 0.0, 1.0, 0.5, 0.01)
     
-    x = np.arange(0, n+1)
-    y = stats.binom.pmf(x, n, p)
+    # One table per (n, p) serves the chart and every probability below.
+    with stage("distribution_table"):
+        table = cached_binomial_table(n, p)
+    x, y = table.display_range()
     
     fig = go.Figure()
     fig.add_trace(go.Bar(x=x, y=y, name='PMF'))
@@ -64,9 +67,9 @@ def run_binomial_distribution():
     # Calculate probabilities
     k = st.number_input("Enter a number of successes (k) to calculate probabilities:", min_value=0, max_value=n, value=min(10, n), step=1)
     
-    exact_prob = stats.binom.pmf(k, n, p)
-    less_than_prob = stats.binom.cdf(k, n, p)
-    greater_than_prob = 1 - stats.binom.cdf(k-1, n, p)
+    exact_prob = table.pmf_at(k)
+    less_than_prob = table.cdf_at(k)
+    greater_than_prob = table.sf_at(k)
     
     st.write(f"Probability of exactly {k} successes: {exact_prob:.4f}")
     st.write(f"Probability of {k} or fewer successes: {less_than_prob:.4f}")
@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+import numpy as np
+from scipy.special import ndtr
+
+BlackScholesChain = namedtuple(
+    "BlackScholesChain",
+    [
+        "call", "put",
+        "delta_call", "delta_put", "vega", "theta_call", "theta_put", "rho_call", "rho_put",
+        "gamma", "vanna", "vomma", "charm", "veta",
+    ],
+)
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+def _d1_d2(S, K, T, r, sigma):
+    vol_sqrt_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+def black_scholes_call(S, K, T, r, sigma):
+    d1, d2 = _d1_d2(S, K, T, r, sigma)
+    return S * ndtr(d1) - K * np.exp(-r * T) * ndtr(d2)
+
+def black_scholes_put(S, K, T, r, sigma):
+    d1, d2 = _d1_d2(S, K, T, r, sigma)
+    return K * np.exp(-r * T) * ndtr(-d2) - S * ndtr(-d1)
+
+def black_scholes_chain(S, K, T, r, sigma):
+    # Prices and Greeks for a whole chain from one broadcasted d1/d2 evaluation.
+    # Theta, charm and veta are per year of calendar time (i.e. d/dt = -d/dT).
+    S, K, T, r, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma)))
+    sqrt_t = np.sqrt(T)
+    vol_sqrt_t = sigma * sqrt_t
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+
+    nd1, nd2 = ndtr(d1), ndtr(d2)
+    pdf = _norm_pdf(d1)
+    disc_k = K * np.exp(-r * T)
+
+    call = S * nd1 - disc_k * nd2
+    # Put-call parity reuses the call leg instead of two more CDF evaluations.
+    put = call - S + disc_k
+
+    vega = S * pdf * sqrt_t
+    decay = -S * pdf * sigma / (2 * sqrt_t)
+    theta_call = decay - r * disc_k * nd2
+    theta_put = decay + r * disc_k * (1 - nd2)
+
+    return BlackScholesChain(
+        call=call,
+        put=put,
+        delta_call=nd1,
+        delta_put=nd1 - 1,
+        vega=vega,
+        theta_call=theta_call,
+        theta_put=theta_put,
+        rho_call=T * disc_k * nd2,
+        rho_put=-T * disc_k * (1 - nd2),
+        gamma=pdf / (S * vol_sqrt_t),
+        vanna=-pdf * d2 / sigma,
+        vomma=vega * d1 * d2 / sigma,
+        charm=-pdf * (2 * r * T - d2 * vol_sqrt_t) / (2 * T * vol_sqrt_t),
+        veta=vega * (r * d1 / vol_sqrt_t - (1 + d1 * d2) / (2 * T)),
+    )
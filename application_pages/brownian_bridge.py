@@ -0,0 +1,91 @@
+import math
+
+import numpy as np
+
+# Barrier monitoring between simulated dates. Conditional on its endpoints,
+# the log-price over a gap is a Brownian bridge (the drift drops out), so a
+# path simulated on any grid can be checked against a barrier either exactly
+# in continuous time, or exactly on a schedule of monitoring dates by drawing
+# bridge values at those dates. Bridge values are only drawn for gaps that
+# could plausibly cross the barrier, so the cost follows the number of paths
+# near the barrier rather than the number of monitoring dates.
+
+DEFAULT_TOL = 1e-6
+
+def crossing_probability(x0, x1, log_barrier, variance, up):
+    # P(bridge from x0 to x1 with total variance sigma^2 * dt touches the
+    # barrier) for endpoints on the same side of it; 1 if an endpoint is past it.
+    d0 = log_barrier - x0 if up else x0 - log_barrier
+    d1 = log_barrier - x1 if up else x1 - log_barrier
+    safe_var = np.where(variance > 0, variance, 1.0)
+    p = np.where(variance > 0, np.exp(-2.0 * np.maximum(d0, 0) * np.maximum(d1, 0) / safe_var), 0.0)
+    return np.where((d0 <= 0) | (d1 <= 0), 1.0, p)
+
+def _past(x, log_barrier, up):
+    return x >= log_barrier if up else x <= log_barrier
+
+def _candidate_gaps(X, time_grid, sigma, log_barrier, up, tol, hit):
+    # Every (path, gap) whose bridge crosses with probability above tol, for
+    # paths not already known to hit.
+    variance = sigma**2 * np.diff(time_grid)
+    p = crossing_probability(X[:, :-1], X[:, 1:], log_barrier, variance, up)
+    p[hit] = 0.0
+    paths, gaps = np.nonzero(p > tol)
+    return paths, gaps, X[paths, gaps], X[paths, gaps + 1], variance[gaps], p[paths, gaps]
+
+def continuous_barrier_hit(X, time_grid, sigma, log_barrier, up, rng, tol=DEFAULT_TOL):
+    # X holds log(S / S0) at time_grid, shape (num_paths, num_dates). A path
+    # hits if any date is past the barrier or, gap by gap, with the exact
+    # bridge crossing probability. Gaps below tol are skipped.
+    hit = _past(X, log_barrier, up).any(axis=1)
+    paths, _, _, _, _, p = _candidate_gaps(X, time_grid, sigma, log_barrier, up, tol, hit)
+    crossed = rng.random(len(p)) < p
+    hit[paths[crossed]] = True
+    return hit
+
+def monitoring_dates(T, monitoring_dt):
+    # 0, monitoring_dt, 2 monitoring_dt, ... up to and including T.
+    return monitoring_dt * np.arange(int(math.floor(T / monitoring_dt * (1 + 1e-12))) + 1)
+
+def discrete_barrier_hit(X, time_grid, sigma, log_barrier, up, monitoring_dt, rng, tol=DEFAULT_TOL):
+    # The barrier is checked on monitoring_dates(T, monitoring_dt) only, on any
+    # simulation grid: dates that fall on the grid are read from X, the others
+    # are drawn from the bridge over the gap containing them, left to right,
+    # each conditional on the previous date's value and the gap's right end.
+    # Grid values between monitoring dates never count as hits. Gaps whose
+    # continuous crossing probability (an upper bound on a discrete hit) is
+    # tol or below are skipped.
+    if monitoring_dt <= 0:
+        raise ValueError("monitoring_dt must be positive; use continuous_barrier_hit for continuous monitoring")
+    dates = monitoring_dates(time_grid[-1], monitoring_dt)
+    eps = 1e-9 * max(time_grid[-1], 1.0)
+    column = np.clip(np.searchsorted(time_grid, dates - eps), 0, len(time_grid) - 1)
+    on_grid = np.abs(time_grid[column] - dates) <= eps
+    hit = _past(X[:, column[on_grid]], log_barrier, up).any(axis=1)
+
+    # Off-grid dates per gap, as a (num_gaps, max_dates) table padded with NaN.
+    off = dates[~on_grid]
+    gap_of = np.clip(np.searchsorted(time_grid, off, side="right") - 1, 0, len(time_grid) - 2)
+    counts = np.bincount(gap_of, minlength=len(time_grid) - 1)
+    if len(off) == 0:
+        return hit
+    table = np.full((len(time_grid) - 1, counts.max()), np.nan)
+    rank = np.arange(len(off)) - np.concatenate([[0], np.cumsum(counts)[:-1]])[gap_of]
+    table[gap_of, rank] = off
+
+    paths, gaps, x, x1, _, _ = _candidate_gaps(X, time_grid, sigma, log_barrier, up, tol, hit)
+    keep = counts[gaps] > 0
+    paths, gaps, x, x1 = paths[keep], gaps[keep], x[keep], x1[keep]
+    a, b = time_grid[gaps], time_grid[gaps + 1]
+    for k in range(table.shape[1]):
+        tau = table[gaps, k]
+        active = ~np.isnan(tau) & ~hit[paths]
+        paths, gaps, x, x1, a, b, tau = (v[active] for v in (paths, gaps, x, x1, a, b, tau))
+        if len(paths) == 0:
+            break
+        # Bridge from (a, x) to (b, x1) evaluated at tau.
+        w = (tau - a) / (b - a)
+        x = x + w * (x1 - x) + sigma * np.sqrt((tau - a) * (b - tau) / (b - a)) * rng.standard_normal(len(paths))
+        hit[paths[_past(x, log_barrier, up)]] = True
+        a = tau
+    return hit
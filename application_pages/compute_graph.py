@@ -0,0 +1,109 @@
+import numpy as np
+from application_pages.instrumentation import stage as timed_stage
+
+# Dependency-tracked page computations. A page declares its stages once, each
+# with the parameters and upstream stages it reads; a run then recomputes a
+# stage only when one of those inputs changed since the session's previous
+# run and reuses the previous output otherwise. Stages are evaluated lazily,
+# so only the ones the page asks for (and their inputs) run at all.
+#
+# Each session keeps its own GraphState, holding the last output of every
+# stage; heavy intermediates can be marked keep=False to hold only their
+# signature, and are recomputed on demand if a dependent later needs them.
+
+def fingerprint(value):
+    # A cheap, hashable stand-in for a parameter value, compared between runs.
+    if isinstance(value, np.ndarray):
+        return ("array", value.shape, value.dtype.str, hash(value.tobytes()))
+    if isinstance(value, (tuple, list)):
+        return tuple(fingerprint(v) for v in value)
+    if isinstance(value, (np.floating, np.integer, np.bool_)):
+        return value.item()
+    return value
+
+_DROPPED = object()
+
+class GraphState:
+    def __init__(self):
+        # stage -> (signature, version, value or _DROPPED)
+        self.entries = {}
+        self.recomputed = []
+        self.reused = []
+
+class ComputeGraph:
+    def __init__(self, name):
+        self.name = name
+        self._stages = {}
+
+    def stage(self, name, inputs, keep=True):
+        # Registers fn as stage name; fn receives its inputs positionally, in
+        # the order given. Inputs are parameter names or earlier stage names.
+        def register(fn):
+            self._stages[name] = (tuple(inputs), fn, keep)
+            return fn
+        return register
+
+    def state(self, session_state):
+        # One GraphState per session and graph, kept in st.session_state.
+        slot = f"{self.name}_graph"
+        if session_state.get(slot) is None:
+            session_state[slot] = GraphState()
+        return session_state[slot]
+
+    def run(self, state, params):
+        return GraphRun(self, state, params)
+
+class GraphRun:
+    def __init__(self, graph, state, params):
+        self.graph = graph
+        self.state = state
+        self.params = params
+        self._signatures = {}
+        self._values = {}
+        state.recomputed, state.reused = [], []
+
+    def update(self, **params):
+        # For pages that read their widgets in several steps. Parameters are
+        # only ever added during a run, never changed.
+        self.params.update(params)
+
+    def _signature(self, name):
+        # Parameters compare by value, upstream stages by version, so a stage
+        # recomputed to the same signature does not invalidate its dependents.
+        if name in self._signatures:
+            return self._signatures[name]
+        inputs, _, _ = self.graph._stages[name]
+        parts = []
+        for dep in inputs:
+            if dep in self.graph._stages:
+                self._signature(dep)
+                parts.append(("stage", dep, self.state.entries[dep][1]))
+            else:
+                parts.append(("param", dep, fingerprint(self.params[dep])))
+        signature = tuple(parts)
+
+        entry = self.state.entries.get(name)
+        if entry is None or entry[0] != signature:
+            version = entry[1] + 1 if entry is not None else 0
+            self.state.entries[name] = (signature, version, _DROPPED)
+        self._signatures[name] = signature
+        return signature
+
+    def __getitem__(self, name):
+        if name not in self.graph._stages:
+            return self.params[name]
+        if name in self._values:
+            return self._values[name]
+        signature = self._signature(name)
+        inputs, fn, keep = self.graph._stages[name]
+        _, version, value = self.state.entries[name]
+        if value is _DROPPED:
+            args = [self[dep] for dep in inputs]
+            with timed_stage(name):
+                value = fn(*args)
+            self.state.recomputed.append(name)
+            self.state.entries[name] = (signature, version, value if keep else _DROPPED)
+        else:
+            self.state.reused.append(name)
+        self._values[name] = value
+        return value
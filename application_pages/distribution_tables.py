@@ -0,0 +1,91 @@
+import math
+
+import numpy as np
+from application_pages.result_cache import ResultCache
+
+table_cache = ResultCache(max_bytes=32 * 1024**2)
+
+class DistributionTable:
+    # PMF, CDF and upper tail of a distribution on 0..k_max, built once and
+    # then queried without further SciPy calls. The upper tail is summed from
+    # the right so small tail probabilities keep full relative precision.
+    def __init__(self, pmf, tail_mass=0.0):
+        self.pmf = pmf
+        self.cdf = np.cumsum(pmf)
+        # sf[k] = P(X > k); tail_mass is any probability beyond k_max.
+        self.sf = np.empty_like(pmf)
+        self.sf[:-1] = np.cumsum(pmf[::-1])[::-1][1:] + tail_mass
+        self.sf[-1] = tail_mass
+        self.support = np.arange(len(pmf))
+
+    @property
+    def nbytes(self):
+        return self.pmf.nbytes + self.cdf.nbytes + self.sf.nbytes + self.support.nbytes
+
+    @property
+    def k_max(self):
+        return len(self.pmf) - 1
+
+    def pmf_at(self, k):
+        return float(self.pmf[k]) if 0 <= k <= self.k_max else 0.0
+
+    def cdf_at(self, k):
+        if k < 0:
+            return 0.0
+        return float(self.cdf[min(k, self.k_max)])
+
+    def sf_at(self, k):
+        if k < 0:
+            return 1.0
+        return float(self.sf[k]) if k <= self.k_max else 0.0
+
+    def display_range(self, max_points=200, rel_tol=1e-12):
+        # Small tables are shown whole; large ones are trimmed to where the PMF
+        # is visible next to its peak.
+        if len(self.pmf) <= max_points:
+            return self.support, self.pmf
+        visible = np.flatnonzero(self.pmf >= self.pmf.max() * rel_tol)
+        lo, hi = visible[0], visible[-1] + 1
+        return self.support[lo:hi], self.pmf[lo:hi]
+
+def _from_log_pmf(log_pmf):
+    # Shift by the peak before exponentiating so nothing underflows to zero
+    # near the mode, then renormalise away the rounding drift of the recurrence.
+    pmf = np.exp(log_pmf - log_pmf.max())
+    return pmf / pmf.sum()
+
+def binomial_table(n, p):
+    n = int(n)
+    if p <= 0.0 or p >= 1.0:
+        pmf = np.zeros(n + 1)
+        pmf[0 if p <= 0.0 else n] = 1.0
+        return DistributionTable(pmf)
+    # log P(k+1) - log P(k) = log((n - k) / (k + 1)) + log(p / (1 - p)),
+    # accumulated from log P(0) = n log(1 - p).
+    k = np.arange(n)
+    steps = np.log((n - k) / (k + 1.0)) + (math.log(p) - math.log1p(-p))
+    log_pmf = np.empty(n + 1)
+    log_pmf[0] = n * math.log1p(-p)
+    np.cumsum(steps, out=log_pmf[1:])
+    log_pmf[1:] += log_pmf[0]
+    return DistributionTable(_from_log_pmf(log_pmf))
+
+def poisson_k_max(lam):
+    # Far enough into the right tail that the mass beyond is below double precision.
+    return int(math.ceil(lam + 12 * math.sqrt(lam) + 30))
+
+def poisson_table(lam, k_max=None):
+    k_max = poisson_k_max(lam) if k_max is None else int(k_max)
+    # log P(k) - log P(k-1) = log(lam / k), accumulated from log P(0) = -lam.
+    k = np.arange(1, k_max + 1)
+    log_pmf = np.empty(k_max + 1)
+    log_pmf[0] = -lam
+    np.cumsum(math.log(lam) - np.log(k), out=log_pmf[1:])
+    log_pmf[1:] += log_pmf[0]
+    return DistributionTable(_from_log_pmf(log_pmf))
+
+def cached_binomial_table(n, p):
+    return table_cache.get_or_compute(("binomial", int(n), float(p)), lambda: binomial_table(n, p))
+
+def cached_poisson_table(lam):
+    return table_cache.get_or_compute(("poisson", float(lam)), lambda: poisson_table(lam))
@@ -0,0 +1,189 @@
+import math
+import os
+import threading
+
+import numpy as np
+
+# Fused Monte Carlo kernels: each path draws its normals, evolves its
+# log-price and keeps the running maximum, minimum and sum it needs for its
+# payoff in a single pass, so the path matrix is never materialised. With
+# Numba installed the per-path loop is compiled and spread over all cores;
+# otherwise the same recurrence runs vectorised over a chunk of paths in NumPy.
+#
+# Normals come from a counter-based generator (SplitMix64 plus Box-Muller)
+# keyed by (seed, path index), so a path's draws do not depend on how paths
+# are chunked or which thread runs them, and both backends see the same draws.
+try:
+    import numba
+    from numba import njit, prange
+    HAVE_NUMBA, NUMBA_VERSION = True, numba.__version__
+except ImportError:
+    HAVE_NUMBA, NUMBA_VERSION = False, None
+
+# Streamlit runs sessions in threads. The kernel already uses every core, so
+# launches are serialised, which lets the dependency-free workqueue layer be
+# used. (The TBB layer can hang interpreter exit after a launch from a
+# non-main thread.) NUMBA_THREADING_LAYER still overrides this.
+if HAVE_NUMBA and "NUMBA_THREADING_LAYER" not in os.environ:
+    numba.config.THREADING_LAYER = "workqueue"
+_launch_lock = threading.Lock()
+
+EUROPEAN, ASIAN, BARRIER = 0, 1, 2
+STYLE_CODES = {"european": EUROPEAN, "asian": ASIAN, "barrier": BARRIER}
+BACKENDS = ("numba", "numpy")
+DEFAULT_CHUNK_SIZE = 1_000_000
+NUMPY_CHUNK_SIZE = 65_536
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_STREAM = np.uint64(0xD1B54A32D192ED03)
+_SHIFT_30, _SHIFT_27, _SHIFT_31, _SHIFT_11 = np.uint64(30), np.uint64(27), np.uint64(31), np.uint64(11)
+_ONE = np.uint64(1)
+_TO_UNIT = 1.0 / 9007199254740992.0
+
+def _mix64(z):
+    z = (z ^ (z >> _SHIFT_30)) * _MIX1
+    z = (z ^ (z >> _SHIFT_27)) * _MIX2
+    return z ^ (z >> _SHIFT_31)
+
+def _to_unit(z):
+    # 53 random bits mapped to (0, 1]; zero is excluded so log() stays finite.
+    return ((z >> _SHIFT_11) + _ONE) * _TO_UNIT
+
+def default_backend():
+    return "numba" if HAVE_NUMBA else "numpy"
+
+def stream_key(seed):
+    return np.random.SeedSequence(seed).generate_state(1, dtype=np.uint64)[0]
+
+def _numpy_kernel(payoffs, controls, key, start, S0, K, drift, vol, num_steps, is_call, style,
+                  log_barrier, barrier_up, knock_out, antithetic, discount):
+    signs = np.array([1.0, -1.0] if antithetic else [1.0])[:, None]
+    for lo in range(0, len(payoffs), NUMPY_CHUNK_SIZE):
+        n = min(NUMPY_CHUNK_SIZE, len(payoffs) - lo)
+        state = _mix64(key + np.arange(start + lo, start + lo + n, dtype=np.uint64) * _STREAM)
+        x = np.zeros((len(signs), n))
+        hi, low, total = np.zeros_like(x), np.zeros_like(x), np.zeros_like(x)
+        spare = None
+        for j in range(num_steps):
+            if j % 2 == 0:
+                state += _GOLDEN
+                u1 = _to_unit(_mix64(state))
+                state += _GOLDEN
+                u2 = _to_unit(_mix64(state))
+                radius = np.sqrt(-2.0 * np.log(u1))
+                z, spare = radius * np.cos(2.0 * np.pi * u2), radius * np.sin(2.0 * np.pi * u2)
+            else:
+                z = spare
+            x += drift + vol * signs * z
+            if style == ASIAN:
+                total += np.exp(x)
+            elif style == BARRIER:
+                np.maximum(hi, x, out=hi)
+                np.minimum(low, x, out=low)
+
+        S_T = S0 * np.exp(x)
+        vanilla = np.maximum(S_T - K, 0.0) if is_call else np.maximum(K - S_T, 0.0)
+        if style == ASIAN:
+            average = S0 * total / num_steps
+            payoff = np.maximum(average - K, 0.0) if is_call else np.maximum(K - average, 0.0)
+        elif style == BARRIER:
+            hit = hi >= log_barrier if barrier_up else low <= log_barrier
+            payoff = np.where(hit != knock_out, vanilla, 0.0)
+        else:
+            payoff = vanilla
+        payoffs[lo:lo + n] = discount * payoff.mean(axis=0)
+        controls[lo:lo + n] = discount * vanilla.mean(axis=0)
+
+if HAVE_NUMBA:
+    _mix64_nb = njit(cache=True)(_mix64)
+    _to_unit_nb = njit(cache=True)(_to_unit)
+
+    @njit(cache=True)
+    def _leg_payoffs(x, hi, low, total, S0, K, num_steps, is_call, style, log_barrier, barrier_up, knock_out):
+        S_T = S0 * math.exp(x)
+        vanilla = max(S_T - K, 0.0) if is_call else max(K - S_T, 0.0)
+        if style == ASIAN:
+            average = S0 * total / num_steps
+            payoff = max(average - K, 0.0) if is_call else max(K - average, 0.0)
+        elif style == BARRIER:
+            hit = hi >= log_barrier if barrier_up else low <= log_barrier
+            payoff = vanilla if hit != knock_out else 0.0
+        else:
+            payoff = vanilla
+        return payoff, vanilla
+
+    @njit(parallel=True, cache=True)
+    def _numba_kernel(payoffs, controls, key, start, S0, K, drift, vol, num_steps, is_call, style,
+                      log_barrier, barrier_up, knock_out, antithetic, discount):
+        for p in prange(payoffs.shape[0]):
+            state = _mix64_nb(key + np.uint64(start + p) * _STREAM)
+            # Leg a follows +z, leg b the antithetic -z; b is skipped when unused.
+            x_a, hi_a, low_a, total_a = 0.0, 0.0, 0.0, 0.0
+            x_b, hi_b, low_b, total_b = 0.0, 0.0, 0.0, 0.0
+            z, spare = 0.0, 0.0
+            for j in range(num_steps):
+                if j % 2 == 0:
+                    state += _GOLDEN
+                    u1 = _to_unit_nb(_mix64_nb(state))
+                    state += _GOLDEN
+                    u2 = _to_unit_nb(_mix64_nb(state))
+                    radius = math.sqrt(-2.0 * math.log(u1))
+                    z, spare = radius * math.cos(2.0 * math.pi * u2), radius * math.sin(2.0 * math.pi * u2)
+                else:
+                    z = spare
+                x_a += drift + vol * z
+                if antithetic:
+                    x_b += drift - vol * z
+                if style == ASIAN:
+                    total_a += math.exp(x_a)
+                    if antithetic:
+                        total_b += math.exp(x_b)
+                elif style == BARRIER:
+                    hi_a, low_a = max(hi_a, x_a), min(low_a, x_a)
+                    if antithetic:
+                        hi_b, low_b = max(hi_b, x_b), min(low_b, x_b)
+
+            payoff, vanilla = _leg_payoffs(x_a, hi_a, low_a, total_a, S0, K, num_steps, is_call, style,
+                                           log_barrier, barrier_up, knock_out)
+            if antithetic:
+                payoff_b, vanilla_b = _leg_payoffs(x_b, hi_b, low_b, total_b, S0, K, num_steps, is_call, style,
+                                                   log_barrier, barrier_up, knock_out)
+                payoff, vanilla = 0.5 * (payoff + payoff_b), 0.5 * (vanilla + vanilla_b)
+            payoffs[p] = discount * payoff
+            controls[p] = discount * vanilla
+
+def iter_fused_payoffs(S0, K, T, r, sigma, num_steps, num_samples, option_type="call", style="european",
+                       barrier=None, barrier_type="down-and-out", antithetic=False, seed=None,
+                       chunk_size=DEFAULT_CHUNK_SIZE, backend=None):
+    # Yields (payoffs, controls) for consecutive chunks of samples: discounted
+    # payoffs and discounted same-strike European payoffs (the control). With
+    # antithetic=True each sample is the average over a +z/-z pair of paths.
+    # The two buffers are reused, so consumers must copy a chunk they keep.
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend == "numba" and not HAVE_NUMBA:
+        raise ValueError("The numba backend needs Numba installed")
+    kernel = _numba_kernel if backend == "numba" else _numpy_kernel
+
+    dt = T / num_steps
+    drift, vol = (r - 0.5 * sigma**2) * dt, sigma * math.sqrt(dt)
+    barrier_up = barrier_type.startswith("up")
+    knock_out = barrier_type.endswith("out")
+    log_barrier = math.log(barrier / S0) if style == "barrier" else 0.0
+    args = (S0, K, drift, vol, num_steps, option_type == "call", STYLE_CODES[style], log_barrier,
+            barrier_up, knock_out, antithetic, math.exp(-r * T))
+
+    key = stream_key(seed)
+    payoffs = np.empty(min(chunk_size, num_samples))
+    controls = np.empty_like(payoffs)
+    for start in range(0, num_samples, chunk_size):
+        n = min(chunk_size, num_samples - start)
+        if backend == "numba":
+            with _launch_lock:
+                kernel(payoffs[:n], controls[:n], key, start, *args)
+        else:
+            kernel(payoffs[:n], controls[:n], key, start, *args)
+        yield payoffs[:n], controls[:n]
@@ -0,0 +1,111 @@
+import numpy as np
+from application_pages.result_cache import ResultCache
+
+gbm_cache = ResultCache(max_bytes=256 * 1024**2)
+
+def gbm_time_grid(T, dt):
+    # round() rather than int() so that e.g. T=0.3, dt=0.1 gives 3 steps, not 2;
+    # the grid always starts at 0 and ends exactly at T.
+    num_steps = max(1, int(round(T / dt)))
+    return np.linspace(0, T, num_steps + 1)
+
+def simulate_gbm(S0, mu, sigma, T, dt, num_simulations, dtype=np.float64, out=None, rng=None):
+    return simulate_gbm_at(S0, mu, sigma, gbm_time_grid(T, dt), num_simulations, dtype=dtype, out=out, rng=rng)
+
+def simulate_gbm_at(S0, mu, sigma, times, num_simulations, dtype=np.float64, out=None, rng=None):
+    # Samples GBM exactly at arbitrary increasing dates starting at 0: the
+    # log-increment over each gap is drawn from its exact normal law, so
+    # uneven or sparse monitoring dates carry no discretisation error.
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("dtype must be float32 or float64")
+
+    time_grid = np.asarray(times, dtype=np.float64)
+    if len(time_grid) and (time_grid[0] != 0 or np.any(np.diff(time_grid) < 0)):
+        raise ValueError("times must start at 0 and be non-decreasing")
+    num_steps = len(time_grid)
+    shape = (num_simulations, num_steps)
+
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous array with shape {shape} and dtype {dtype}")
+    if num_steps == 0:
+        return time_grid, out
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Draw the standard normals straight into the output buffer and transform
+    # them in place so no separate dW or temporary matrix is ever allocated.
+    rng.standard_normal(out=out, dtype=dtype)
+    return time_grid, gbm_paths_from_normals(S0, mu, sigma, np.diff(time_grid, prepend=0.0), out)
+
+def gbm_paths_from_normals(S0, mu, sigma, dt, Z):
+    # Overwrites Z (num_paths, num_steps) with GBM paths; column 0 is the start
+    # price and columns 1.. consume one standard normal per step. dt is either
+    # the uniform step or one gap per column (the first is ignored).
+    Z *= sigma * np.sqrt(dt)
+    Z += (mu - 0.5 * sigma**2) * dt
+    Z[:, 0] = 0.0
+    np.cumsum(Z, axis=1, out=Z)
+    np.exp(Z, out=Z)
+    Z *= S0
+    return Z
+
+def brownian_paths(times, num_simulations, dtype=np.float64, out=None, rng=None):
+    # Standard Brownian motion W at the given dates, drawn exactly as
+    # simulate_gbm_at draws its normals, so for the same rng
+    # gbm_paths_from_brownian(S0, mu, sigma, times, W) reproduces its paths.
+    time_grid = np.asarray(times, dtype=np.float64)
+    if out is None:
+        out = np.empty((num_simulations, len(time_grid)), dtype=dtype)
+    if len(time_grid) == 0:
+        return time_grid, out
+    rng = rng or np.random.default_rng()
+    rng.standard_normal(out=out, dtype=out.dtype)
+    out *= np.sqrt(np.diff(time_grid, prepend=0.0)).astype(out.dtype)
+    out[:, 0] = 0.0
+    np.cumsum(out, axis=1, out=out)
+    return time_grid, out
+
+def gbm_paths_from_brownian(S0, mu, sigma, times, W, out=None):
+    # S(t) = S0 exp((mu - sigma^2 / 2) t + sigma W(t)). The Brownian draws do
+    # not depend on S0, mu or sigma, so changing any of them reuses W.
+    drift = ((mu - 0.5 * sigma**2) * np.asarray(times)).astype(W.dtype)
+    out = np.multiply(W, W.dtype.type(sigma), out=out)
+    out += drift
+    np.exp(out, out=out)
+    out *= S0
+    return out
+
+def brownian_order_statistics(W, quantiles, block_columns=16):
+    # For each quantile, the two order statistics of W per date that
+    # np.quantile's default (linear) method interpolates between, plus the
+    # weight. S is increasing in W at every date, so quantiles of S for any
+    # S0, mu and sigma > 0 follow from these without touching W again.
+    n = W.shape[0]
+    position = (n - 1) * np.asarray(quantiles, dtype=np.float64)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    kth = np.unique(np.concatenate([lower, upper]))
+    lo, hi = np.empty((len(lower), W.shape[1])), np.empty((len(lower), W.shape[1]))
+    # Column blocks bound the copy np.partition makes (W may be a memmap).
+    for start in range(0, W.shape[1], block_columns):
+        block = np.partition(np.asarray(W[:, start:start + block_columns], dtype=np.float64), kth, axis=0)
+        lo[:, start:start + block_columns] = block[lower]
+        hi[:, start:start + block_columns] = block[upper]
+    return lo, hi, position - lower
+
+def gbm_quantiles_from_brownian(S0, mu, sigma, times, order_statistics):
+    lo, hi, weight = order_statistics
+    S_lo = gbm_paths_from_brownian(S0, mu, sigma, times, lo)
+    S_hi = gbm_paths_from_brownian(S0, mu, sigma, times, hi)
+    return S_lo + weight[:, None] * (S_hi - S_lo)
+
+def cached_brownian_paths(T, dt, num_simulations, seed, dtype=np.float64):
+    key = ("brownian", float(T), float(dt), int(num_simulations), int(seed), np.dtype(dtype).str)
+    return gbm_cache.get_or_compute(
+        key,
+        lambda: brownian_paths(gbm_time_grid(T, dt), num_simulations, dtype=dtype, rng=np.random.default_rng(seed)),
+    )
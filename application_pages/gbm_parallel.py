@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from application_pages.gbm_engine import gbm_cache, gbm_time_grid, simulate_gbm
+from application_pages.gbm_streaming import stream_gbm_statistics
+
+# Paths are always split into blocks of a fixed size and block b always draws
+# from child b of SeedSequence(seed). The worker count only decides who runs
+# which block, so results for a given seed are identical for any pool size.
+DEFAULT_BLOCK_SIZE = 10_000
+DEFAULT_STREAM_BLOCK_SIZE = 100_000
+STREAM_WINDOW = 2
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+def default_workers():
+    return os.cpu_count() or 1
+
+def _mp_context():
+    # The pool is created inside the Streamlit server, which already runs the
+    # Tornado loop, job threads and Numba's worker threads; forking a process
+    # with threads running can deadlock, so workers come from a forkserver.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def get_executor(max_workers=None):
+    global _executor, _executor_workers
+    max_workers = max_workers or default_workers()
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=_mp_context())
+            _executor_workers = max_workers
+        return _executor
+
+def shutdown_executor():
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
+        _executor_workers = None
+
+def block_layout(num_simulations, block_size):
+    starts = list(range(0, num_simulations, block_size))
+    return [(start, min(block_size, num_simulations - start)) for start in starts]
+
+def block_seeds(seed, num_blocks):
+    return np.random.SeedSequence(seed).spawn(num_blocks)
+
+def _run_blocks(func, tasks, max_workers):
+    max_workers = max_workers or default_workers()
+    if max_workers == 1 or len(tasks) == 1:
+        return [func(task) for task in tasks]
+    return list(get_executor(max_workers).map(func, tasks))
+
+def _simulate_block(task):
+    shm_name, shape, dtype, start, n, params, child_seed = task
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        S = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        simulate_gbm(*params, n, dtype=dtype, out=S[start:start + n], rng=np.random.default_rng(child_seed))
+        del S
+    finally:
+        shm.close()
+
+def parallel_simulate_gbm(S0, mu, sigma, T, dt, num_simulations, seed, dtype=np.float64,
+                          block_size=DEFAULT_BLOCK_SIZE, max_workers=None):
+    dtype = np.dtype(dtype)
+    time_grid = gbm_time_grid(T, dt)
+    shape = (num_simulations, len(time_grid))
+    blocks = block_layout(num_simulations, block_size)
+    if not blocks or shape[1] == 0:
+        return time_grid, np.empty(shape, dtype=dtype)
+
+    # Workers write their blocks straight into one shared segment rather than
+    # pickling result arrays back through the pool.
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * dtype.itemsize)
+    try:
+        params = (S0, mu, sigma, T, dt)
+        tasks = [
+            (shm.name, shape, dtype.str, start, n, params, child)
+            for (start, n), child in zip(blocks, block_seeds(seed, len(blocks)))
+        ]
+        _run_blocks(_simulate_block, tasks, max_workers)
+        S = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return time_grid, S
+
+def _stream_block(task):
+    params, n, child_seed, chunk_size = task
+    return stream_gbm_statistics(*params, n, chunk_size=chunk_size, seed=child_seed)
+
+def iter_parallel_stream_gbm_statistics(S0, mu, sigma, T, dt, num_simulations, seed, chunk_size=None,
+                                        block_size=DEFAULT_STREAM_BLOCK_SIZE, max_workers=None):
+    # Yields (blocks_done, num_blocks, stats) after each block is merged, so
+    # callers can show partial results. Closing the generator early cancels
+    # the submitted blocks that have not started yet.
+    blocks = block_layout(num_simulations, block_size)
+    params = (S0, mu, sigma, T, dt)
+    tasks = [(params, n, child, chunk_size) for (_, n), child in zip(blocks, block_seeds(seed, len(blocks)))]
+    if not tasks:
+        yield 0, 0, stream_gbm_statistics(S0, mu, sigma, T, dt, 0)
+        return
+
+    max_workers = max_workers or default_workers()
+    serial = max_workers == 1 or len(tasks) == 1
+    executor = None if serial else get_executor(max_workers)
+    # At most STREAM_WINDOW blocks per worker are in flight, so finished blocks
+    # cannot pile up behind a slow one that is still ahead of them in the merge.
+    futures = deque()
+
+    # Merge in block order so floating-point accumulation does not depend on
+    # scheduling. Each block is dropped once merged (each holds num_dates x
+    # num_bins counts), so memory does not grow with the number of blocks.
+    stats = None
+    try:
+        for i in range(len(tasks)):
+            if serial:
+                block_stats = _stream_block(tasks[i])
+            else:
+                while len(futures) < STREAM_WINDOW * max_workers and i + len(futures) < len(tasks):
+                    futures.append(executor.submit(_stream_block, tasks[i + len(futures)]))
+                block_stats = futures.popleft().result()
+            stats = block_stats if stats is None else stats.merge(block_stats)
+            del block_stats
+            yield i + 1, len(tasks), stats
+    finally:
+        for f in futures:
+            f.cancel()
+
+def parallel_stream_gbm_statistics(S0, mu, sigma, T, dt, num_simulations, seed, chunk_size=None,
+                                   block_size=DEFAULT_STREAM_BLOCK_SIZE, max_workers=None):
+    stats = None
+    for _, _, stats in iter_parallel_stream_gbm_statistics(S0, mu, sigma, T, dt, num_simulations, seed,
+                                                           chunk_size, block_size, max_workers):
+        pass
+    return stats
+
+def stream_cache_key(S0, mu, sigma, T, dt, num_simulations, seed):
+    return ("parallel-stream", float(S0), float(mu), float(sigma), float(T), float(dt), int(num_simulations), int(seed))
+
+def cached_parallel_stream_gbm_statistics(S0, mu, sigma, T, dt, num_simulations, seed, max_workers=None):
+    return gbm_cache.get_or_compute(
+        stream_cache_key(S0, mu, sigma, T, dt, num_simulations, seed),
+        lambda: parallel_stream_gbm_statistics(S0, mu, sigma, T, dt, num_simulations, seed, max_workers=max_workers),
+    )
@@ -1,20 +1,82 @@
 
+import time
+
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
+from application_pages.compute_graph import ComputeGraph
+from application_pages.gbm_engine import (brownian_order_statistics, cached_brownian_paths, gbm_paths_from_brownian,
+                                          gbm_quantiles_from_brownian, gbm_time_grid)
+from application_pages.instrumentation import record_array, stage
+from application_pages.simulation_jobs import DONE, FAILED, submit_stream_statistics
+from application_pages.path_store import default_path_store
+from application_pages.path_rendering import (DEFAULT_BAND_THRESHOLD, DEFAULT_QUANTILES, PALETTE, band_traces,
+                                              decimation_indices, display_traces)
 
-def simulate_gbm(S0, mu, sigma, T, dt, num_simulations):
-    num_steps = int(T / dt)
-    time_grid = np.linspace(0, T, num_steps)
-    dW = np.random.normal(0, np.sqrt(dt), (num_simulations, num_steps))
-    
-    S = np.zeros((num_simulations, num_steps))
-    S[:, 0] = S0
-    
-    for t in range(1, num_steps):
-        S[:, t] = S[:, t-1] * np.exp((mu - 0.5 * sigma**2) * dt + sigma * dW[:, t])
-    
-    return time_grid, S
+FAN_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+JOB_POLL_SECONDS = 0.5
+
+# Individual paths are built in stages so a rerun only redoes what its inputs
+# touch: the Brownian draws, and which of their points are drawn, depend on
+# (T, dt, paths, seed) alone; mu and sigma only change how those points are
+# turned into prices, and S0 only rescales the prices computed for S0 = 1.
+gbm_graph = ComputeGraph("gbm_simulation")
+
+# W itself is held by gbm_cache or the path store, not by each session.
+@gbm_graph.stage("brownian", ["T", "dt", "num_simulations", "seed", "store"], keep=False)
+def _brownian(T, dt, num_simulations, seed, store):
+    if store is not None:
+        return store.get_or_create_brownian(T, dt, num_simulations, seed)
+    return cached_brownian_paths(T, dt, num_simulations, seed)
+
+@gbm_graph.stage("decimation", ["brownian"])
+def _decimation(brownian):
+    # LTTB's choice of points does not change when y is shifted, sheared or
+    # scaled, so on log-prices it is the same for every S0, mu and sigma and
+    # can be made once on W.
+    time_grid, W = brownian
+    return decimation_indices(time_grid, W)
+
+@gbm_graph.stage("decimated_paths", ["brownian", "decimation", "mu", "sigma"])
+def _decimated_paths(brownian, decimation, mu, sigma):
+    time_grid, W = brownian
+    groups = []
+    for k, idx in enumerate(decimation):
+        t = time_grid[idx]
+        W_k = np.take_along_axis(W[k::len(decimation)], idx, axis=1)
+        groups.append((t, gbm_paths_from_brownian(1.0, mu, sigma, t, W_k)))
+    return "paths", groups
+
+@gbm_graph.stage("order_statistics", ["brownian"])
+def _order_statistics(brownian):
+    return brownian_order_statistics(brownian[1], DEFAULT_QUANTILES)
+
+@gbm_graph.stage("quantile_bands", ["brownian", "order_statistics", "mu", "sigma"])
+def _quantile_bands(brownian, order_statistics, mu, sigma):
+    time_grid = brownian[0]
+    return "bands", time_grid, gbm_quantiles_from_brownian(1.0, mu, sigma, time_grid, order_statistics)
+
+def _paths_figure(display, S0):
+    fig = go.Figure(display_traces(display, 'Simulations', scale=S0))
+    fig.update_layout(
+        title="Geometric Brownian Motion Simulations",
+        xaxis_title="Time",
+        yaxis_title="Stock Price",
+        legend_title="Simulations"
+    )
+    return fig
+
+gbm_graph.stage("paths_figure", ["decimated_paths", "S0"])(_paths_figure)
+gbm_graph.stage("bands_figure", ["quantile_bands", "S0"])(_paths_figure)
+
+def _rerun():
+    # st.rerun replaced st.experimental_rerun in newer Streamlit releases.
+    rerun = getattr(st, "rerun", None) or st.experimental_rerun
+    rerun()
+
+def warm_up():
+    # Widget defaults for the "Individual paths" view.
+    cached_brownian_paths(1.0, 0.01, 10, 42)
 
 def run_gbm_simulation():
     st.header("Geometric Brownian Motion Simulation")
@@ -24,6 +86,10 @@ def run_gbm_simulation():
     Adjust the parameters below to see how they affect the simulated stock price paths.
     """)
     
+    mode = st.radio("Display mode", ["Individual paths", "Fan chart (streamed statistics)"], horizontal=True)
+    streaming = mode != "Individual paths"
+    store = default_path_store()
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -34,22 +100,82 @@ def run_gbm_simulation():
     with col2:
         T = st.number_input("Time horizon (T) in years", min_value=0.1, max_value=10.0, value=1.0, step=0.1)
         dt = st.number_input("Time step (dt)", min_value=0.001, max_value=0.1, value=0.01, step=0.001)
-        num_simulations = st.number_input("Number of simulations", min_value=1, max_value=1000, value=10, step=1)
+        if streaming:
+            num_simulations = st.number_input("Number of simulations", min_value=1, max_value=10_000_000, value=100_000, step=1000)
+        else:
+            # Stored paths live on disk rather than in the session, so the cap can be much higher.
+            # With the store the cap also keeps one entry within its disk quota.
+            max_paths = 1000
+            if store is not None:
+                max_paths = max(1, min(1_000_000, store.max_paths(len(gbm_time_grid(T, dt)))))
+            num_simulations = st.number_input("Number of simulations", min_value=1, max_value=max_paths,
+                                              value=min(10, max_paths), step=1)
+        seed = st.number_input("Random seed", min_value=0, value=42, step=1)
     
-    time_grid, S = simulate_gbm(S0, mu, sigma, T, dt, num_simulations)
+    job_running = False
+    if streaming:
+        # Large runs happen in a background job; the page shows partial
+        # statistics from the blocks finished so far and polls until done.
+        with stage("submit_job"):
+            job, stats = submit_stream_statistics(st.session_state, sigma, T, dt, num_simulations, seed)
+        if job is not None:
+            status, progress, partial = job.snapshot()
+            if status == FAILED:
+                raise job.error
+            if status == DONE:
+                stats = job.result
+            else:
+                job_running = True
+                stats = partial
+                st.progress(progress, text=f"Simulating in the background: {progress:.0%} of {num_simulations:,} paths")
+        if stats is None:
+            st.info("Simulation started. The chart appears as soon as the first block of paths is finished.")
+            time.sleep(JOB_POLL_SECONDS)
+            _rerun()
+        # The job ran with S0 = 1 and mu = 0; other values are an exact rescaling.
+        stats = stats.rescaled(S0, mu)
+        record_array("histogram_counts", stats.counts)
+        time_grid = stats.time_grid
+        with stage("quantile_bands"):
+            bands = stats.quantile_bands(FAN_QUANTILES)
+        
+        with stage("build_figure"):
+            fig = go.Figure(band_traces(time_grid, bands, 'Paths', PALETTE[0], FAN_QUANTILES))
+            fig.add_trace(go.Scatter(x=time_grid, y=stats.mean, mode='lines', name='Mean', line=dict(dash='dash')))
+    else:
+        params = dict(S0=S0, mu=mu, sigma=sigma, T=T, dt=dt, num_simulations=int(num_simulations), seed=int(seed),
+                      store=store)
+        graph = gbm_graph.run(gbm_graph.state(st.session_state), params)
+        many = num_simulations > DEFAULT_BAND_THRESHOLD
+        fig = graph["bands_figure" if many else "paths_figure"]
+        record_array("brownian", graph["brownian"][1])
+        if many:
+            st.caption(f"More than {DEFAULT_BAND_THRESHOLD} paths: showing quantile bands instead of individual paths.")
     
-    fig = go.Figure()
-    for i in range(num_simulations):
-        fig.add_trace(go.Scatter(x=time_grid, y=S[i, :], mode='lines', name=f'Simulation {i+1}'))
+    if streaming:
+        fig.update_layout(
+            title="Geometric Brownian Motion Simulations",
+            xaxis_title="Time",
+            yaxis_title="Stock Price",
+            legend_title="Simulations"
+        )
     
-    fig.update_layout(
-        title="Geometric Brownian Motion Simulations",
-        xaxis_title="Time",
-        yaxis_title="Stock Price",
-        legend_title="Simulations"
-    )
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
     
-    st.plotly_chart(fig, use_container_width=True)
+    if streaming:
+        edges, counts = stats.terminal_histogram()
+        hist = go.Figure()
+        hist.add_trace(go.Bar(x=0.5 * (edges[:-1] + edges[1:]), y=counts / stats.count, width=np.diff(edges), name='Terminal price'))
+        hist.update_layout(
+            title="Distribution of Terminal Stock Price",
+            xaxis_title="Stock Price at T",
+            yaxis_title="Probability",
+            xaxis_range=[bands[0, -1] * 0.5, bands[4, -1] * 1.5]
+        )
+        with stage("plotly_chart"):
+            st.plotly_chart(hist, use_container_width=True)
+        st.write(f"Mean terminal price: {stats.mean[-1]:.2f} (std {stats.std[-1]:.2f}) over {stats.count:,} paths")
     
     st.markdown("""
     ### Interpretation
@@ -58,3 +184,7 @@ def run_gbm_simulation():
     - Higher volatility (σ) leads to wider spread of possible outcomes.
     - The drift (μ) influences the overall trend of the paths.
     """)
+    
+    if job_running:
+        time.sleep(JOB_POLL_SECONDS)
+        _rerun()
@@ -0,0 +1,158 @@
+import copy
+
+import numpy as np
+from application_pages.gbm_engine import brownian_paths, gbm_time_grid, simulate_gbm
+
+# Chunks are sized in bytes rather than paths, so a chunk (and the scratch
+# arrays StreamingGBMStats.update makes from it, a few times its size) costs
+# the same memory whatever the number of dates.
+DEFAULT_CHUNK_BYTES = 8 * 1024**2
+
+def chunk_rows(num_dates, dtype=np.float64, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    return max(1, chunk_bytes // (max(num_dates, 1) * np.dtype(dtype).itemsize))
+
+def merge_moments(a, b):
+    # Chan et al. merge of two (count, mean, m2) summaries, m2 being the sum of
+    # squared deviations from the mean. Means and m2 may be arrays, merged
+    # elementwise; an m2 with one more axis than the mean is a co-moment matrix.
+    if a is None or a[0] == 0:
+        return b
+    if b[0] == 0:
+        return a
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    spread = np.multiply.outer(delta, delta) if np.ndim(m2_a) > np.ndim(mean_a) else delta**2
+    return n, mean_a + delta * (n_b / n), m2_a + (m2_b + spread * (n_a * n_b / n))
+
+def iter_gbm_chunks(S0, mu, sigma, T, dt, num_simulations, chunk_size=None, seed=None, dtype=np.float64):
+    # A single buffer is reused for every chunk, so peak memory depends on
+    # chunk_size and num_steps only, never on num_simulations. Consumers must
+    # copy a chunk if they need it after advancing the generator.
+    time_grid = gbm_time_grid(T, dt)
+    chunk_size = chunk_size or chunk_rows(len(time_grid), dtype)
+    rng = np.random.default_rng(seed)
+    buffer = np.empty((min(chunk_size, num_simulations), len(time_grid)), dtype=dtype)
+
+    remaining = num_simulations
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        _, S = simulate_gbm(S0, mu, sigma, T, dt, n, dtype=dtype, out=buffer[:n], rng=rng)
+        yield time_grid, S
+        remaining -= n
+
+def iter_brownian_chunks(T, dt, num_simulations, chunk_size=None, seed=None, dtype=np.float64):
+    # Brownian motion in the same chunks and from the same draws as
+    # iter_gbm_chunks; the buffer is reused in the same way.
+    time_grid = gbm_time_grid(T, dt)
+    chunk_size = chunk_size or chunk_rows(len(time_grid), dtype)
+    rng = np.random.default_rng(seed)
+    buffer = np.empty((min(chunk_size, num_simulations), len(time_grid)), dtype=dtype)
+
+    remaining = num_simulations
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        _, W = brownian_paths(time_grid, n, out=buffer[:n], rng=rng)
+        yield time_grid, W
+        remaining -= n
+
+class StreamingGBMStats:
+    def __init__(self, S0, mu, sigma, time_grid, num_bins=400, z_range=8.0):
+        self.S0 = S0
+        self.mu = mu
+        self.time_grid = time_grid
+        self.count = 0
+        self._mean = np.zeros(len(time_grid))
+        self._m2 = np.zeros(len(time_grid))
+
+        # Log-prices are standardised against the exact GBM marginal at each
+        # timestep, so one fixed set of z-bins covers every column and the
+        # per-timestep histograms never need rebinning as chunks arrive.
+        self._log_drift = (mu - 0.5 * sigma**2) * time_grid
+        self._log_scale = sigma * np.sqrt(time_grid)
+        self._safe_scale = np.where(self._log_scale > 0, self._log_scale, 1.0)
+        self.z_edges = np.linspace(-z_range, z_range, num_bins + 1)
+        self.counts = np.zeros((len(time_grid), num_bins), dtype=np.int64)
+
+    def update(self, S):
+        n_b = S.shape[0]
+        if n_b == 0:
+            return
+        mean_b = S.mean(axis=0, dtype=np.float64)
+        m2_b = ((S - mean_b) ** 2).sum(axis=0)
+        self.count, self._mean, self._m2 = merge_moments((self.count, self._mean, self._m2), (n_b, mean_b, m2_b))
+
+        num_steps, num_bins = self.counts.shape
+        z = np.log(S / self.S0, dtype=np.float64)
+        z -= self._log_drift
+        z /= self._safe_scale
+        width = self.z_edges[1] - self.z_edges[0]
+        idx = np.clip(((z - self.z_edges[0]) / width).astype(np.int64), 0, num_bins - 1)
+        idx += np.arange(num_steps) * num_bins
+        self.counts += np.bincount(idx.ravel(), minlength=num_steps * num_bins).reshape(num_steps, num_bins)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.count, self._mean, self._m2 = merge_moments((self.count, self._mean, self._m2),
+                                                         (other.count, other._mean, other._m2))
+        self.counts += other.counts
+        return self
+
+    def rescaled(self, S0, mu):
+        # The same draws under another start price and drift: every path is
+        # multiplied by (S0 / self.S0) exp((mu - self.mu) t), which scales the
+        # moments exactly and leaves the standardised log-price counts as they are.
+        factor = (S0 / self.S0) * np.exp((mu - self.mu) * self.time_grid)
+        other = copy.copy(self)
+        other.S0, other.mu = S0, mu
+        other._mean = self._mean * factor
+        other._m2 = self._m2 * factor**2
+        other._log_drift = self._log_drift + (mu - self.mu) * self.time_grid
+        return other
+
+    @property
+    def mean(self):
+        return self._mean.copy()
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return np.zeros_like(self._m2)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def _z_to_price(self, z, step=slice(None)):
+        return self.S0 * np.exp(self._log_drift[step] + self._log_scale[step] * z)
+
+    def quantile_bands(self, quantiles):
+        cdf = np.cumsum(self.counts, axis=1) / max(self.count, 1)
+        bands = np.empty((len(quantiles), len(self.time_grid)))
+        for i, q in enumerate(quantiles):
+            # First bin whose cumulative mass reaches q, then interpolate linearly inside it.
+            j = np.minimum((cdf < q).sum(axis=1), cdf.shape[1] - 1)
+            rows = np.arange(cdf.shape[0])
+            below = np.where(j > 0, cdf[rows, j - 1], 0.0)
+            mass = cdf[rows, j] - below
+            frac = np.where(mass > 0, (q - below) / np.where(mass > 0, mass, 1.0), 0.5)
+            z = self.z_edges[j] + frac * (self.z_edges[j + 1] - self.z_edges[j])
+            bands[i] = self._z_to_price(z)
+        return bands
+
+    def terminal_histogram(self):
+        return self._z_to_price(self.z_edges, -1), self.counts[-1].copy()
+
+    @property
+    def nbytes(self):
+        return self._mean.nbytes + self._m2.nbytes + self.counts.nbytes
+
+def stream_gbm_statistics(S0, mu, sigma, T, dt, num_simulations, chunk_size=None, seed=None, num_bins=400):
+    time_grid = gbm_time_grid(T, dt)
+    stats = StreamingGBMStats(S0, mu, sigma, time_grid, num_bins=num_bins)
+    for _, S in iter_gbm_chunks(S0, mu, sigma, T, dt, num_simulations, chunk_size=chunk_size, seed=seed):
+        stats.update(S)
+    return stats
@@ -0,0 +1,164 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+from application_pages.black_scholes import black_scholes_chain
+from application_pages.gbm_engine import simulate_gbm
+from application_pages.gbm_parallel import parallel_stream_gbm_statistics
+from application_pages.implied_vol import implied_volatility
+
+# The pricing and simulation kernels without Streamlit: as array functions,
+# as table functions over CSV/Parquet, and as a CLI, e.g.
+#   python -m application_pages.headless price portfolio.parquet --output priced.parquet
+#   python -m application_pages.headless implied-vol quotes.csv --output ivs.csv
+#   python -m application_pages.headless simulate --paths 1000000 --output fan.csv
+#   python -m application_pages.headless serve --port 8600
+# Tables are read with pandas (and pyarrow for Parquet), which ship with Streamlit.
+
+OPTION_TYPES = ("call", "put")
+CONTRACT_COLUMNS = ("S", "K", "T", "r", "sigma")
+QUOTE_COLUMNS = ("price", "S", "K", "T", "r")
+GREEK_COLUMNS = ("price", "delta", "gamma", "vega", "theta", "rho", "vanna", "vomma", "charm", "veta")
+FAN_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def _option_types(option_type, n):
+    option_type = np.broadcast_to(np.asarray(option_type, dtype=object), (n,))
+    unknown = set(option_type) - set(OPTION_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown option type(s): {', '.join(sorted(map(str, unknown)))}")
+    return option_type == "call"
+
+def price_contracts(S, K, T, r, sigma, option_type="call"):
+    # Black-Scholes price and Greeks for a batch of contracts, picking the call
+    # or put figure per contract. Returns a dict of 1-d arrays (GREEK_COLUMNS).
+    S, K, T, r, sigma = (np.ravel(x) for x in np.broadcast_arrays(*(np.asarray(v, dtype=np.float64)
+                                                                      for v in (S, K, T, r, sigma))))
+    is_call = _option_types(option_type, len(S))
+    chain = black_scholes_chain(S, K, T, r, sigma)
+    return {
+        "price": np.where(is_call, chain.call, chain.put),
+        "delta": np.where(is_call, chain.delta_call, chain.delta_put),
+        "gamma": chain.gamma,
+        "vega": chain.vega,
+        "theta": np.where(is_call, chain.theta_call, chain.theta_put),
+        "rho": np.where(is_call, chain.rho_call, chain.rho_put),
+        "vanna": chain.vanna,
+        "vomma": chain.vomma,
+        "charm": chain.charm,
+        "veta": chain.veta,
+    }
+
+def implied_vol_contracts(price, S, K, T, r, option_type="call"):
+    price = np.ravel(np.asarray(price, dtype=np.float64))
+    result = implied_volatility(price, S, K, T, r, np.where(_option_types(option_type, len(price)), "call", "put"))
+    return {"iv": np.ravel(result.iv), "converged": np.ravel(result.converged),
+            "iterations": np.ravel(result.iterations)}
+
+def simulate_summary(S0, mu, sigma, T, dt, num_paths, seed=None, quantiles=FAN_QUANTILES):
+    # Per-date mean, standard deviation and quantiles from the streamed
+    # statistics, so memory does not grow with num_paths.
+    stats = parallel_stream_gbm_statistics(S0, mu, sigma, T, dt, num_paths, seed)
+    summary = {"t": stats.time_grid, "mean": stats.mean, "std": stats.std}
+    for q, band in zip(quantiles, stats.quantile_bands(quantiles)):
+        summary[f"q{q * 100:g}"] = band
+    return summary
+
+def simulate_paths(S0, mu, sigma, T, dt, num_paths, seed=None):
+    # Raw paths as columns: one row per path, one column per date.
+    time_grid, S = simulate_gbm(S0, mu, sigma, T, dt, num_paths, rng=np.random.default_rng(seed))
+    return {f"t={t:g}": S[:, i] for i, t in enumerate(time_grid)}
+
+def read_table(path):
+    import pandas as pd
+    if path == "-":
+        return pd.read_csv(sys.stdin)
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def write_table(table, path=None):
+    import pandas as pd
+    table = pd.DataFrame(table)
+    if path is None or path == "-":
+        table.to_csv(sys.stdout, index=False)
+    elif os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+def _table_columns(table, names, defaults):
+    missing = [name for name in names if name not in table and defaults.get(name) is None]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    return [table[name].to_numpy() if name in table else defaults[name] for name in names]
+
+def price_table(table, r=None, option_type="call"):
+    # Adds GREEK_COLUMNS to a table with columns S, K, T, r, sigma and an
+    # optional option_type; r and option_type can also be given for all rows.
+    table = table.copy()
+    S, K, T, rate, sigma = _table_columns(table, CONTRACT_COLUMNS, {"r": r})
+    types = table["option_type"].to_numpy() if "option_type" in table else option_type
+    for name, values in price_contracts(S, K, T, rate, sigma, types).items():
+        table[name] = values
+    return table
+
+def implied_vol_table(table, r=None, option_type="call"):
+    table = table.copy()
+    price, S, K, T, rate = _table_columns(table, QUOTE_COLUMNS, {"r": r})
+    types = table["option_type"].to_numpy() if "option_type" in table else option_type
+    for name, values in implied_vol_contracts(price, S, K, T, rate, types).items():
+        table[name] = values
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Price options and simulate GBM without the Streamlit app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("price", "Black-Scholes prices and Greeks for a table of contracts"),
+                            ("implied-vol", "implied volatilities for a table of option quotes")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("input", help="CSV or Parquet file ('-' for CSV on stdin)")
+        command.add_argument("--output", help="CSV or Parquet file (CSV on stdout if omitted)")
+        command.add_argument("--rate", type=float, help="risk-free rate for tables without an r column")
+        command.add_argument("--option-type", choices=OPTION_TYPES, default="call",
+                             help="option type for tables without an option_type column")
+
+    simulate = commands.add_parser("simulate", help="simulate GBM paths")
+    simulate.add_argument("--S0", type=float, default=100.0)
+    simulate.add_argument("--mu", type=float, default=0.05)
+    simulate.add_argument("--sigma", type=float, default=0.2)
+    simulate.add_argument("--T", type=float, default=1.0)
+    simulate.add_argument("--dt", type=float, default=0.01)
+    simulate.add_argument("--paths", type=int, default=100_000)
+    simulate.add_argument("--seed", type=int, default=42)
+    simulate.add_argument("--raw", action="store_true", help="write every path instead of per-date statistics")
+    simulate.add_argument("--output", help="CSV or Parquet file (CSV on stdout if omitted)")
+
+    serve = commands.add_parser("serve", help="run the batching HTTP/JSON pricing service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8600)
+    serve.add_argument("--max-batch", type=int, default=100_000, help="contracts per vectorised kernel call")
+    serve.add_argument("--max-wait-ms", type=float, default=2.0, help="how long a batch waits for more requests")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        from application_pages.pricing_service import serve as run_service
+        run_service(args.host, args.port, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+        return 0
+
+    try:
+        if args.command == "price":
+            result = price_table(read_table(args.input), args.rate, args.option_type)
+        elif args.command == "implied-vol":
+            result = implied_vol_table(read_table(args.input), args.rate, args.option_type)
+        else:
+            simulate_args = (args.S0, args.mu, args.sigma, args.T, args.dt, args.paths, args.seed)
+            result = simulate_paths(*simulate_args) if args.raw else simulate_summary(*simulate_args)
+    except ValueError as exc:
+        parser.error(str(exc))
+    write_table(result, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
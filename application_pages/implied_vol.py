@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+import numpy as np
+from scipy.special import ndtr
+from application_pages.black_scholes import _d1_d2, _norm_pdf
+
+ImpliedVolResult = namedtuple("ImpliedVolResult", ["iv", "converged", "iterations", "status"])
+
+# Per-quote outcome, in ImpliedVolResult.status.
+CONVERGED, OUT_OF_BOUNDS, FLAT_VEGA, MAX_ITER = 0, 1, 2, 3
+
+SIGMA_MIN = 1e-6
+SIGMA_MAX = 10.0
+
+def _initial_guess(C, S, X, T):
+    # Corrado-Miller rational approximation, with the Brenner-Subrahmanyam
+    # at-the-money value where its radicand goes negative.
+    half_gap = 0.5 * (S - X)
+    excess = C - half_gap
+    radicand = np.maximum(excess**2 - (S - X) ** 2 / np.pi, 0.0)
+    guess = np.sqrt(2 * np.pi / T) / (S + X) * (excess + np.sqrt(radicand))
+    fallback = np.sqrt(2 * np.pi / T) * C / S
+    guess = np.where(np.isfinite(guess) & (guess > 0), guess, fallback)
+    return np.clip(guess, 0.01, 5.0)
+
+def implied_volatility(price, S, K, T, r, option_type="call", tol=1e-10, max_iter=100):
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r)))
+    shape = price.shape
+    is_call = np.broadcast_to(np.asarray(option_type) == "call", shape)
+    price, S, K, T, r = (x.ravel() for x in (price, S, K, T, r))
+    is_call = is_call.ravel()
+
+    X = K * np.exp(-r * T)
+    # Solve everything as calls; puts are mapped over by put-call parity.
+    C = np.where(is_call, price, price + S - X)
+
+    iv = np.full(C.shape, np.nan)
+    converged = np.zeros(C.shape, dtype=bool)
+    iterations = np.zeros(C.shape, dtype=np.int64)
+
+    # Quotes outside the no-arbitrage bounds have no implied volatility.
+    valid = (C > np.maximum(S - X, 0.0)) & (C < S) & (T > 0)
+    idx = np.flatnonzero(valid)
+    sigma = _initial_guess(C[idx], S[idx], X[idx], T[idx])
+    lo = np.full(idx.shape, SIGMA_MIN)
+    hi = np.full(idx.shape, SIGMA_MAX)
+    prev_error = np.full(idx.shape, np.inf)
+
+    for it in range(1, max_iter + 1):
+        if idx.size == 0:
+            break
+        s_, k_, t_, r_, c_ = S[idx], K[idx], T[idx], r[idx], C[idx]
+        d1, d2 = _d1_d2(s_, k_, t_, r_, sigma)
+        diff = s_ * ndtr(d1) - X[idx] * ndtr(d2) - c_
+        vega = s_ * _norm_pdf(d1) * np.sqrt(t_)
+
+        # The call price is increasing in sigma, so the sign of the error
+        # tightens a bracket that the bisection fallback can always rely on.
+        hi = np.where(diff > 0, sigma, hi)
+        lo = np.where(diff <= 0, sigma, lo)
+
+        # tol is in volatility units: compare the Newton step, not the raw
+        # price error, so flat-vega quotes are not accepted at the wrong sigma.
+        done = (np.abs(diff) < tol * vega) | (hi - lo < tol)
+        iterations[idx] = it
+        if done.any():
+            iv[idx[done]] = sigma[done]
+            converged[idx[done]] = True
+            keep = ~done
+            idx, sigma, lo, hi, prev_error = idx[keep], sigma[keep], lo[keep], hi[keep], prev_error[keep]
+            d1, d2, diff, vega = d1[keep], d2[keep], diff[keep], vega[keep]
+            if idx.size == 0:
+                break
+
+        # Halley step using vomma = vega * d1 * d2 / sigma.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = diff / vega
+            correction = 1 - 0.5 * newton * d1 * d2 / sigma
+            step = np.where(np.abs(correction) > 0.5, newton / correction, newton)
+            candidate = sigma - step
+        # Bisect when the step leaves the bracket, or when the last step failed
+        # to halve the price error (deep out-of-the-money quotes with vanishing vega).
+        error = np.abs(diff)
+        bisect = ~np.isfinite(candidate) | (candidate <= lo) | (candidate >= hi) | (error > 0.5 * prev_error)
+        sigma = np.where(bisect, 0.5 * (lo + hi), candidate)
+        prev_error = error
+
+    # Anything left has hit max_iter; report its best estimate unconverged.
+    iv[idx] = sigma
+    status = np.where(converged, CONVERGED, np.where(valid, MAX_ITER, OUT_OF_BOUNDS))
+    if idx.size:
+        # Below this vega, a sigma step of tol moves the price by less than its
+        # rounding error, so the quote cannot pin the volatility down.
+        d1, _ = _d1_d2(S[idx], K[idx], T[idx], r[idx], sigma)
+        flat = S[idx] * _norm_pdf(d1) * np.sqrt(T[idx]) * tol < np.finfo(np.float64).eps * S[idx]
+        status[idx[flat]] = FLAT_VEGA
+    return ImpliedVolResult(iv.reshape(shape), converged.reshape(shape), iterations.reshape(shape),
+                            status.reshape(shape))
@@ -0,0 +1,164 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Per-run stage timings and array sizes. Streamlit runs each session's script
+# in its own thread, so the active run lives in a context variable; stage()
+# and record_array() are no-ops when no run is active (e.g. in benchmarks).
+_current_run = contextvars.ContextVar("qulab_page_run", default=None)
+
+# Set to a file path to append one JSON line per page run.
+METRICS_LOG_ENV = "QULAB_METRICS_LOG"
+
+class PageRun:
+    def __init__(self, page):
+        self.page = page
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.total_seconds = None
+        self.stages = []
+        self.arrays = []
+
+    def to_dict(self):
+        return {
+            "page": self.page,
+            "started_at": self.started_at,
+            "total_seconds": self.total_seconds,
+            "stages": self.stages,
+            "arrays": self.arrays,
+        }
+
+class MetricsRegistry:
+    def __init__(self, max_recent=200):
+        self._lock = threading.Lock()
+        self.runs_total = defaultdict(int)
+        self.run_seconds = defaultdict(float)
+        self.stage_count = defaultdict(int)
+        self.stage_seconds = defaultdict(float)
+        self.stage_max_seconds = defaultdict(float)
+        self.array_max_bytes = defaultdict(int)
+        self.recent = deque(maxlen=max_recent)
+
+    def observe(self, run):
+        with self._lock:
+            self.runs_total[run.page] += 1
+            self.run_seconds[run.page] += run.total_seconds
+            for s in run.stages:
+                key = (run.page, s["stage"])
+                self.stage_count[key] += 1
+                self.stage_seconds[key] += s["seconds"]
+                self.stage_max_seconds[key] = max(self.stage_max_seconds[key], s["seconds"])
+            for a in run.arrays:
+                key = (run.page, a["name"])
+                self.array_max_bytes[key] = max(self.array_max_bytes[key], a["nbytes"])
+            self.recent.append(run.to_dict())
+
+    def prometheus_text(self):
+        def labels(**kw):
+            return "{" + ",".join(f'{k}="{v}"' for k, v in kw.items()) + "}"
+
+        with self._lock:
+            lines = [
+                "# HELP qulab_page_runs_total Page script runs.",
+                "# TYPE qulab_page_runs_total counter",
+            ]
+            lines += [f"qulab_page_runs_total{labels(page=p)} {n}" for p, n in sorted(self.runs_total.items())]
+            lines += [
+                "# HELP qulab_page_run_seconds Wall time of whole page runs.",
+                "# TYPE qulab_page_run_seconds summary",
+            ]
+            for p in sorted(self.runs_total):
+                lines.append(f"qulab_page_run_seconds_sum{labels(page=p)} {self.run_seconds[p]:.6f}")
+                lines.append(f"qulab_page_run_seconds_count{labels(page=p)} {self.runs_total[p]}")
+            lines += [
+                "# HELP qulab_stage_seconds Wall time of instrumented stages.",
+                "# TYPE qulab_stage_seconds summary",
+            ]
+            for (p, s) in sorted(self.stage_count):
+                lines.append(f"qulab_stage_seconds_sum{labels(page=p, stage=s)} {self.stage_seconds[(p, s)]:.6f}")
+                lines.append(f"qulab_stage_seconds_count{labels(page=p, stage=s)} {self.stage_count[(p, s)]}")
+            lines += [
+                "# HELP qulab_stage_max_seconds Slowest observed run of each stage.",
+                "# TYPE qulab_stage_max_seconds gauge",
+            ]
+            lines += [f"qulab_stage_max_seconds{labels(page=p, stage=s)} {v:.6f}"
+                      for (p, s), v in sorted(self.stage_max_seconds.items())]
+            lines += [
+                "# HELP qulab_array_max_bytes Largest recorded allocation of each array.",
+                "# TYPE qulab_array_max_bytes gauge",
+            ]
+            lines += [f"qulab_array_max_bytes{labels(page=p, array=a)} {v}"
+                      for (p, a), v in sorted(self.array_max_bytes.items())]
+        return "\n".join(lines) + "\n"
+
+    def json_lines(self):
+        with self._lock:
+            return "".join(json.dumps(run) + "\n" for run in self.recent)
+
+registry = MetricsRegistry()
+
+def current_run():
+    return _current_run.get()
+
+def start_page_run(page):
+    run = PageRun(page)
+    _current_run.set(run)
+    return run
+
+def finish_page_run():
+    run = _current_run.get()
+    if run is None:
+        return None
+    run.total_seconds = time.perf_counter() - run._t0
+    _current_run.set(None)
+    registry.observe(run)
+
+    path = os.environ.get(METRICS_LOG_ENV)
+    if path:
+        with open(path, "a") as f:
+            f.write(json.dumps(run.to_dict()) + "\n")
+    return run
+
+@contextmanager
+def stage(name):
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.stages.append({"stage": name, "seconds": time.perf_counter() - t0})
+
+def record_array(name, array):
+    run = _current_run.get()
+    if run is not None:
+        run.arrays.append({"name": name, "nbytes": int(array.nbytes), "shape": list(array.shape), "dtype": str(array.dtype)})
+    return array
+
+def render_debug_panel(run):
+    import streamlit as st
+
+    with st.sidebar.expander("Performance debug", expanded=True):
+        if run is None:
+            st.write("No page run recorded.")
+            return
+        st.write(f"**{run.page}**: {run.total_seconds * 1e3:.1f} ms total")
+        if run.stages:
+            st.table({
+                "Stage": [s["stage"] for s in run.stages],
+                "ms": [round(s["seconds"] * 1e3, 2) for s in run.stages],
+            })
+        if run.arrays:
+            st.table({
+                "Array": [a["name"] for a in run.arrays],
+                "Shape": [" x ".join(map(str, a["shape"])) for a in run.arrays],
+                "MiB": [round(a["nbytes"] / 1024**2, 3) for a in run.arrays],
+            })
+        st.download_button("Prometheus metrics", registry.prometheus_text(), file_name="qulab_metrics.txt")
+        st.download_button("Recent runs (JSON lines)", registry.json_lines(), file_name="qulab_runs.jsonl")
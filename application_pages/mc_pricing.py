@@ -0,0 +1,221 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+from scipy.special import ndtri
+from application_pages.black_scholes import black_scholes_call, black_scholes_put
+from application_pages.brownian_bridge import continuous_barrier_hit, discrete_barrier_hit
+from application_pages.fused_kernels import BACKENDS as FUSED_BACKENDS, iter_fused_payoffs
+from application_pages.gbm_engine import gbm_paths_from_normals, gbm_time_grid
+from application_pages.gbm_streaming import chunk_rows, merge_moments
+
+OPTION_STYLES = ("european", "asian", "barrier")
+BARRIER_TYPES = ("up-and-out", "down-and-out", "up-and-in", "down-and-in")
+# "matrix" builds chunks of full paths; "fused" runs the fused per-path kernel
+# with Numba when it is installed and NumPy otherwise.
+PRICING_BACKENDS = ("matrix", "fused") + FUSED_BACKENDS
+
+MCPriceResult = namedtuple(
+    "MCPriceResult",
+    ["price", "std_error", "num_paths", "num_steps", "control_beta"],
+)
+
+def paths_for_precision(std_error, num_paths, target_error):
+    # Standard error scales as 1/sqrt(N).
+    if target_error <= 0:
+        raise ValueError("target_error must be positive")
+    return int(math.ceil(num_paths * (std_error / target_error) ** 2))
+
+def _vanilla_payoff(S_T, K, option_type):
+    if option_type == "call":
+        return np.maximum(S_T - K, 0.0)
+    return np.maximum(K - S_T, 0.0)
+
+def _payoff(S, K, option_type, style, barrier, barrier_type, monitor=None):
+    if style == "european":
+        return _vanilla_payoff(S[:, -1], K, option_type)
+    if style == "asian":
+        # Arithmetic average over the monitoring dates after t=0.
+        return _vanilla_payoff(S[:, 1:].mean(axis=1), K, option_type)
+
+    if monitor is not None:
+        hit = monitor(S)
+    elif barrier_type.startswith("up"):
+        hit = S.max(axis=1) >= barrier
+    else:
+        hit = S.min(axis=1) <= barrier
+    alive = ~hit if barrier_type.endswith("out") else hit
+    return np.where(alive, _vanilla_payoff(S[:, -1], K, option_type), 0.0)
+
+class _NormalSampler:
+    def __init__(self, sampler, dim, seed):
+        self.sampler = sampler
+        if sampler == "sobol":
+            # scipy.stats is slow to import and only the Sobol sampler needs it.
+            from scipy.stats import qmc
+            self._sobol = qmc.Sobol(d=dim, scramble=True, seed=seed)
+        elif sampler == "pseudo":
+            self._rng = np.random.default_rng(seed)
+        else:
+            raise ValueError(f"Unknown sampler: {sampler}")
+
+    def fill(self, Z):
+        # Column 0 of Z is the start date and carries no draw.
+        if self.sampler == "pseudo":
+            self._rng.standard_normal(out=Z)
+        else:
+            u = self._sobol.random(Z.shape[0])
+            # Keep the inverse CDF finite at the (measure-zero) cube boundary.
+            np.clip(u, 1e-12, 1 - 1e-12, out=u)
+            Z[:, 1:] = ndtri(u)
+
+def _barrier_monitor(S0, sigma, time_grid, barrier, barrier_type, monitoring_dt, rng):
+    # Barrier check between simulated dates: continuous (monitoring_dt == 0)
+    # or every monitoring_dt, both through the Brownian bridge.
+    up, log_barrier = barrier_type.startswith("up"), math.log(barrier / S0)
+    if monitoring_dt == 0:
+        return lambda S: continuous_barrier_hit(np.log(S / S0), time_grid, sigma, log_barrier, up, rng)
+    return lambda S: discrete_barrier_hit(np.log(S / S0), time_grid, sigma, log_barrier, up, monitoring_dt, rng)
+
+def _simulate_payoffs(S0, K, T, r, sigma, time_grid, num_paths, option_type, style, barrier, barrier_type,
+                      antithetic, sampler, chunk_size, monitor=None):
+    dt = time_grid[1] - time_grid[0]
+    num_cols = len(time_grid)
+    discount = np.exp(-r * T)
+    payoffs = np.empty(num_paths)
+    controls = np.empty(num_paths)
+
+    num_legs = 2 if antithetic else 1
+    base = max(1, num_paths // 2) if antithetic else num_paths
+    Z = np.empty((min(chunk_size, base), num_cols))
+    done = 0
+    while done < base:
+        n = min(chunk_size, base - done)
+        z = Z[:n]
+        sampler.fill(z)
+        for k in range(num_legs):
+            if k == 0:
+                # Path generation overwrites its input, so keep z for the mirrored leg.
+                S = gbm_paths_from_normals(S0, r, sigma, dt, z.copy() if antithetic else z)
+            else:
+                S = gbm_paths_from_normals(S0, r, sigma, dt, np.negative(z, out=z))
+            # Antithetic pairs are stored side by side so that pair i is
+            # (payoffs[i], payoffs[base + i]).
+            lo = done + k * base
+            payoffs[lo:lo + n] = discount * _payoff(S, K, option_type, style, barrier, barrier_type, monitor)
+            controls[lo:lo + n] = discount * _vanilla_payoff(S[:, -1], K, option_type)
+        done += n
+
+    used = base * num_legs
+    payoffs, controls = payoffs[:used], controls[:used]
+    if antithetic:
+        payoffs = 0.5 * (payoffs[:base] + payoffs[base:])
+        controls = 0.5 * (controls[:base] + controls[base:])
+    return payoffs, controls, used
+
+def _control_variate(payoffs, controls, control_mean):
+    var = controls.var()
+    if var == 0:
+        return payoffs, 0.0
+    beta = np.cov(payoffs, controls, bias=True)[0, 1] / var
+    return payoffs - beta * (controls - control_mean), beta
+
+def _merge_moments(acc, payoffs, controls):
+    # Means and co-moment matrix of (payoff, control), so fused chunks can be
+    # combined without keeping every sample.
+    samples = np.column_stack((payoffs, controls))
+    mean = samples.mean(axis=0)
+    dev = samples - mean
+    return merge_moments(acc, (len(samples), mean, dev.T @ dev))
+
+def _price_fused(S0, K, T, r, sigma, num_steps, num_paths, control_mean, control_variate, backend, seed, **kwargs):
+    antithetic = kwargs["antithetic"]
+    num_samples = max(1, num_paths // 2) if antithetic else num_paths
+    acc = None
+    for payoffs, controls in iter_fused_payoffs(S0, K, T, r, sigma, num_steps, num_samples, seed=seed,
+                                                backend=backend, **kwargs):
+        acc = _merge_moments(acc, payoffs, controls)
+    n, (mean_p, mean_c), ((pp, pc), (_, cc)) = acc
+    beta = pc / cc if control_variate and cc > 0 else 0.0
+    price = mean_p - beta * (mean_c - control_mean)
+    # Sum of squared deviations of payoff - beta * control.
+    ss = max(pp - 2 * beta * pc + beta**2 * cc, 0.0)
+    std_error = math.sqrt(ss / (n - 1) / n) if n > 1 else float("nan")
+    used = 2 * num_samples if antithetic else num_samples
+    return MCPriceResult(float(price), float(std_error), used, num_steps, float(beta))
+
+def price_option_mc(S0, K, T, r, sigma, option_type="call", style="european", barrier=None,
+                    barrier_type="down-and-out", dt=0.01, num_paths=10_000, antithetic=False,
+                    control_variate=False, sampler="pseudo", seed=None, num_replications=8,
+                    chunk_size=None, backend="matrix", monitoring_dt=None):
+    # Barriers are monitored on the simulation grid by default. monitoring_dt
+    # decouples the two: 0 monitors continuously and a positive value monitors
+    # exactly on the dates k * monitoring_dt, both via Brownian-bridge draws
+    # between the dates of a simulation grid of any spacing.
+    if option_type not in ("call", "put"):
+        raise ValueError(f"Unknown option type: {option_type}")
+    if style not in OPTION_STYLES:
+        raise ValueError(f"Unknown option style: {style}")
+    if style == "barrier" and (barrier is None or barrier_type not in BARRIER_TYPES):
+        raise ValueError("Barrier options need a barrier level and one of " + ", ".join(BARRIER_TYPES))
+    if backend not in PRICING_BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend != "matrix" and sampler != "pseudo":
+        raise ValueError("The fused kernels only support the pseudo-random sampler")
+    if monitoring_dt is not None and (monitoring_dt < 0 or backend != "matrix"):
+        raise ValueError("monitoring_dt must be non-negative and needs the matrix backend")
+
+    time_grid = gbm_time_grid(T, dt)
+    num_steps = len(time_grid) - 1
+    # Matrix chunks hold full paths, so their row count comes from a byte
+    # budget: fine grids get fewer paths per chunk rather than larger chunks.
+    chunk_size = chunk_size or chunk_rows(len(time_grid))
+    # The control is the same-strike vanilla European, whose mean is known in
+    # closed form. For European payoffs this collapses onto the Black-Scholes price.
+    bs = black_scholes_call if option_type == "call" else black_scholes_put
+    control_mean = float(bs(S0, K, T, r, sigma))
+    args = (S0, K, T, r, sigma, time_grid)
+    kwargs = dict(option_type=option_type, style=style, barrier=barrier, barrier_type=barrier_type,
+                  antithetic=antithetic, chunk_size=chunk_size)
+    if style == "barrier" and monitoring_dt is not None:
+        # The bridge draws use the child after the ones the Sobol replications take.
+        bridge_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(num_replications + 1)[-1])
+        kwargs["monitor"] = _barrier_monitor(S0, sigma, time_grid, barrier, barrier_type, monitoring_dt, bridge_rng)
+
+    if backend != "matrix":
+        # Fused chunks hold two floats per sample rather than a path, so they
+        # use the kernel's own, much larger, chunk size.
+        return _price_fused(S0, K, T, r, sigma, num_steps, num_paths, control_mean, control_variate,
+                            None if backend == "fused" else backend, seed,
+                            option_type=option_type, style=style, barrier=barrier, barrier_type=barrier_type,
+                            antithetic=antithetic)
+
+    if sampler == "pseudo":
+        payoffs, controls, used = _simulate_payoffs(
+            *args, num_paths, sampler=_NormalSampler("pseudo", num_steps, seed), **kwargs)
+        beta = 0.0
+        if control_variate:
+            payoffs, beta = _control_variate(payoffs, controls, control_mean)
+        std_error = payoffs.std(ddof=1) / np.sqrt(len(payoffs)) if len(payoffs) > 1 else float("nan")
+        return MCPriceResult(float(payoffs.mean()), float(std_error), used, num_steps, float(beta))
+
+    # Quasi-random points are not independent, so the error is estimated from
+    # independently scrambled Sobol replications. Each replication uses a
+    # power-of-two point count to keep the sequence balanced.
+    per_rep = 2 ** max(2, int(math.ceil(math.log2(max(4, num_paths / num_replications)))))
+    kwargs["chunk_size"] = 2 ** int(math.log2(chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(num_replications)
+    estimates, betas, used = [], [], 0
+    for child in seeds:
+        payoffs, controls, n = _simulate_payoffs(
+            *args, per_rep,
+            sampler=_NormalSampler(sampler, num_steps, np.random.default_rng(child)), **kwargs)
+        beta = 0.0
+        if control_variate:
+            payoffs, beta = _control_variate(payoffs, controls, control_mean)
+        estimates.append(payoffs.mean())
+        betas.append(beta)
+        used += n
+    estimates = np.array(estimates)
+    std_error = estimates.std(ddof=1) / np.sqrt(len(estimates)) if len(estimates) > 1 else float("nan")
+    return MCPriceResult(float(estimates.mean()), float(std_error), used, num_steps, float(np.mean(betas)))
@@ -0,0 +1,184 @@
+from collections import namedtuple
+
+import numpy as np
+from application_pages.gbm_engine import gbm_cache, gbm_time_grid
+from application_pages.gbm_streaming import chunk_rows, merge_moments
+from application_pages.mc_pricing import MCPriceResult
+from application_pages.result_cache import ResultCache
+
+# Correlated GBM for d assets: dS_i / S_i = mu_i dt + sigma_i dW_i with
+# corr(dW_i, dW_j) = rho_ij. Independent normals Z are correlated as Z L^T,
+# where L L^T = rho, in one matrix multiply per block of paths and steps.
+# Terminal-only payoffs (baskets, spreads, portfolio values) need a single
+# correlated draw per path, since log S_i(T) is exactly normal.
+
+factor_cache = ResultCache(max_bytes=16 * 1024**2)
+
+PortfolioSummary = namedtuple(
+    "PortfolioSummary",
+    ["initial_value", "values", "mean", "std", "value_at_risk", "expected_shortfall", "prob_loss"],
+)
+
+def constant_correlation(num_assets, rho):
+    corr = np.full((num_assets, num_assets), float(rho))
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+def _correlation_factor(corr):
+    if corr.ndim != 2 or corr.shape[0] != corr.shape[1]:
+        raise ValueError("Correlation matrix must be square")
+    if not np.allclose(corr, corr.T) or not np.allclose(np.diag(corr), 1.0):
+        raise ValueError("Correlation matrix must be symmetric with a unit diagonal")
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        pass
+    # Positive semi-definite but singular (e.g. perfectly correlated names):
+    # with corr = V diag(w) V^T, the (non-triangular) factor V sqrt(w) still
+    # satisfies L L^T = corr.
+    w, V = np.linalg.eigh(corr)
+    if w.min() < -1e-10:
+        raise ValueError("Correlation matrix must be positive semi-definite")
+    return V * np.sqrt(np.clip(w, 0.0, None))
+
+def correlation_factor(corr):
+    # Factors are cached by matrix contents; reruns with the same correlation
+    # skip the O(d^3) factorisation. The factor is read-only.
+    corr = np.ascontiguousarray(corr, dtype=np.float64)
+    key = ("cholesky", corr.shape, corr.tobytes())
+    return factor_cache.get_or_compute(key, lambda: _correlation_factor(corr))
+
+def _asset_params(S0, mu, sigma, corr):
+    corr = np.asarray(corr, dtype=np.float64)
+    S0, mu, sigma = (np.broadcast_to(np.asarray(x, dtype=np.float64), (corr.shape[0],)) for x in (S0, mu, sigma))
+    return S0, mu, sigma, correlation_factor(corr)
+
+def correlated_normals(rng, L, shape):
+    # Independent draws with the asset axis last, correlated in one matmul.
+    Z = rng.standard_normal(shape + (L.shape[0],))
+    return Z @ L.T
+
+def iter_correlated_terminal(S0, mu, sigma, corr, T, num_paths, seed=None, rng=None, chunk_size=None):
+    # S(T) for every asset in chunks of shape (n, num_assets). As for full
+    # paths, draws are consumed path by path from a single generator, so the
+    # values do not depend on chunk_size.
+    S0, mu, sigma, L = _asset_params(S0, mu, sigma, corr)
+    rng = rng or np.random.default_rng(seed)
+    chunk_size = chunk_size or chunk_rows(len(S0))
+    remaining = num_paths
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        X = correlated_normals(rng, L, (n,))
+        X *= sigma * np.sqrt(T)
+        X += (mu - 0.5 * sigma**2) * T
+        np.exp(X, out=X)
+        X *= S0
+        yield X
+        remaining -= n
+
+def simulate_correlated_terminal(S0, mu, sigma, corr, T, num_paths, seed=None, rng=None, chunk_size=None):
+    # S(T) for every asset, shape (num_paths, num_assets).
+    chunks = list(iter_correlated_terminal(S0, mu, sigma, corr, T, num_paths, seed, rng, chunk_size))
+    return np.concatenate(chunks) if chunks else np.empty((0, np.shape(corr)[0]))
+
+def iter_correlated_paths(S0, mu, sigma, corr, T, dt, num_paths, seed=None, chunk_size=1000):
+    # Full paths in chunks of shape (n, num_dates, num_assets); each chunk is
+    # one block of draws and one matmul. Draws are consumed path by path from
+    # a single generator, so the paths do not depend on chunk_size.
+    S0, mu, sigma, L = _asset_params(S0, mu, sigma, corr)
+    rng = np.random.default_rng(seed)
+    time_grid = gbm_time_grid(T, dt)
+    dts = np.diff(time_grid)
+    scale = sigma * np.sqrt(dts)[:, None]
+    drift = (mu - 0.5 * sigma**2) * dts[:, None]
+
+    remaining = num_paths
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        S = np.empty((n, len(time_grid), len(S0)))
+        S[:, 0] = 0.0
+        S[:, 1:] = correlated_normals(rng, L, (n, len(dts)))
+        S[:, 1:] *= scale
+        S[:, 1:] += drift
+        np.cumsum(S, axis=1, out=S)
+        np.exp(S, out=S)
+        S *= S0
+        yield time_grid, S
+        remaining -= n
+
+def simulate_correlated_gbm(S0, mu, sigma, corr, T, dt, num_paths, seed=None, chunk_size=1000):
+    chunks = [S for _, S in iter_correlated_paths(S0, mu, sigma, corr, T, dt, num_paths, seed, chunk_size)]
+    time_grid = gbm_time_grid(T, dt)
+    return time_grid, (np.concatenate(chunks) if chunks else np.empty((0, len(time_grid), np.shape(corr)[0])))
+
+def basket_payoff(S_T, weights, K, option_type="call"):
+    value = S_T @ np.asarray(weights, dtype=np.float64)
+    return np.maximum(value - K, 0.0) if option_type == "call" else np.maximum(K - value, 0.0)
+
+def spread_payoff(S_T, K, option_type="call", legs=(0, 1)):
+    # Payoff on S_a(T) - S_b(T) - K for the assets in legs.
+    spread = S_T[:, legs[0]] - S_T[:, legs[1]]
+    return np.maximum(spread - K, 0.0) if option_type == "call" else np.maximum(K - spread, 0.0)
+
+def _mc_result(chunks, discount):
+    # Chunks are reduced to a count, mean and sum of squared deviations as
+    # they arrive, so no payoff vector is kept.
+    acc = (0, 0.0, 0.0)
+    for payoffs in chunks:
+        mean = payoffs.mean()
+        dev = payoffs - mean
+        acc = merge_moments(acc, (len(payoffs), mean, dev @ dev))
+    n, mean, ss = acc
+    std_error = discount * np.sqrt(ss / (n - 1) / n) if n > 1 else float("nan")
+    return MCPriceResult(float(discount * mean), float(std_error), n, 1, 0.0)
+
+def price_basket_option(S0, sigma, corr, weights, K, T, r, option_type="call", num_paths=100_000, seed=None):
+    chunks = iter_correlated_terminal(S0, r, sigma, corr, T, num_paths, seed)
+    return _mc_result((basket_payoff(S_T, weights, K, option_type) for S_T in chunks), np.exp(-r * T))
+
+def price_spread_option(S0, sigma, corr, K, T, r, option_type="call", num_paths=100_000, seed=None, legs=(0, 1)):
+    chunks = iter_correlated_terminal(S0, r, sigma, corr, T, num_paths, seed)
+    return _mc_result((spread_payoff(S_T, K, option_type, legs) for S_T in chunks), np.exp(-r * T))
+
+def portfolio_distribution(S0, mu, sigma, corr, holdings, T, num_paths, seed=None, confidence=0.95):
+    # Terminal value of a static portfolio of the assets. VaR and expected
+    # shortfall are positive losses against the initial value, as on the
+    # parameter grid.
+    holdings = np.asarray(holdings, dtype=np.float64)
+    initial_value = float(np.broadcast_to(np.asarray(S0, dtype=np.float64), holdings.shape) @ holdings)
+    # Only the portfolio value of each path is kept, not the per-asset prices.
+    values = np.empty(num_paths)
+    done = 0
+    for S_T in iter_correlated_terminal(S0, mu, sigma, corr, T, num_paths, seed):
+        np.matmul(S_T, holdings, out=values[done:done + len(S_T)])
+        done += len(S_T)
+    losses = initial_value - values
+    var = float(np.quantile(losses, confidence))
+    tail = losses >= var
+    return PortfolioSummary(
+        initial_value=initial_value,
+        values=values,
+        mean=float(values.mean()),
+        std=float(values.std(ddof=1)) if num_paths > 1 else 0.0,
+        value_at_risk=var,
+        expected_shortfall=float(losses[tail].mean()) if tail.any() else var,
+        prob_loss=float((values < initial_value).mean()),
+    )
+
+def _key(*arrays):
+    return tuple(tuple(np.ravel(np.asarray(a, dtype=np.float64)).tolist()) for a in arrays)
+
+def cached_portfolio_distribution(S0, mu, sigma, corr, holdings, T, num_paths, seed, confidence=0.95):
+    key = ("portfolio",) + _key(S0, mu, sigma, corr, holdings) + (float(T), int(num_paths), int(seed), float(confidence))
+    return gbm_cache.get_or_compute(
+        key, lambda: portfolio_distribution(S0, mu, sigma, corr, holdings, T, num_paths, seed, confidence))
+
+def cached_basket_price(S0, sigma, corr, weights, K, T, r, option_type, num_paths, seed):
+    key = ("basket",) + _key(S0, sigma, corr, weights) + (float(K), float(T), float(r), option_type, int(num_paths), int(seed))
+    return gbm_cache.get_or_compute(
+        key, lambda: price_basket_option(S0, sigma, corr, weights, K, T, r, option_type, num_paths, seed))
+
+def cached_spread_price(S0, sigma, corr, K, T, r, option_type, num_paths, seed):
+    key = ("spread",) + _key(S0, sigma, corr) + (float(K), float(T), float(r), option_type, int(num_paths), int(seed))
+    return gbm_cache.get_or_compute(
+        key, lambda: price_spread_option(S0, sigma, corr, K, T, r, option_type, num_paths, seed))
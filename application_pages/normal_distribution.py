@@ -2,9 +2,12 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
-from scipy import stats
+from application_pages.instrumentation import stage
 
 def run_normal_distribution():
+    # Deferred so other pages do not pay for importing scipy.stats.
+    from scipy import stats
+    
     st.header("Normal Distribution")
     
     st.markdown('''
@@ -33,7 +36,8 @@ def run_normal_distribution():
         sigma = st.slider("Standard Deviation (σ)", 0.1, 5.0, 1.0, 0.1)
     
     x = np.linspace(mu - 4*sigma, mu + 4*sigma, 1000)
-    y = stats.norm.pdf(x, mu, sigma)
+    with stage("scipy"):
+        y = stats.norm.pdf(x, mu, sigma)
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name='PDF'))
@@ -67,7 +71,8 @@ def run_normal_distribution():
     # Calculate probabilities
     z_score = st.number_input("Enter a z-score to calculate probabilities:", value=1.0, step=0.1)
     
-    less_than_prob = stats.norm.cdf(z_score)
+    with stage("scipy"):
+        less_than_prob = stats.norm.cdf(z_score)
     greater_than_prob = 1 - less_than_prob
     
     st.write(f"Probability of a value less than {z_score} standard deviations from the mean: {less_than_prob:.4f}")
@@ -1,18 +1,155 @@
 
+import math
+
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from scipy.stats import norm
+from application_pages.black_scholes import black_scholes_chain
+from application_pages.compute_graph import ComputeGraph
+from application_pages.instrumentation import record_array, stage
+from application_pages.implied_vol import FLAT_VEGA, MAX_ITER, OUT_OF_BOUNDS, implied_volatility
+from application_pages.fused_kernels import HAVE_NUMBA
+from application_pages.mc_pricing import BARRIER_TYPES, paths_for_precision, price_option_mc
+from application_pages.multi_asset import (cached_basket_price, cached_portfolio_distribution, cached_spread_price,
+                                           constant_correlation)
+from application_pages.result_cache import ResultCache
+
+bs_cache = ResultCache(max_bytes=16 * 1024**2)
+
+# Barrier monitoring spacing passed to price_option_mc: None monitors on the
+# simulation grid, 0 continuously, anything else on exactly every monitoring_dt
+# (whatever the simulation step) via Brownian-bridge draws.
+MONITORING_CHOICES = {"Simulation grid": None, "Daily (252 per year)": 1 / 252, "Continuous": 0.0}
+# The matrix backend keeps a payoff and a control per path; the fused kernel
+# reduces them chunk by chunk and takes the full 10M.
+MATRIX_MAX_PATHS = 2_000_000
+# Why a quote has no implied volatility, by solver status.
+IV_FAILURES = {
+    OUT_OF_BOUNDS: "the quote is outside the no-arbitrage bounds for these inputs",
+    FLAT_VEGA: "the price hardly moves with volatility here (vega is too small to pin it down)",
+    MAX_ITER: "the solver did not converge within its iteration limit",
+}
+# Standard errors below this are rounding noise: the control variate makes a
+# European estimate exact, and no number of paths would improve on it.
+EXACT_STD_ERROR = 1e-12
+
+# The value curves are drawn S +/- CURVE_HALF_WIDTH, but computed on a fixed
+# unit grid between the multiples of CURVE_BLOCK around that window, so moving
+# S within a block only moves the window and the current-price marker, not
+# the curves, and the grid stays a few hundred points for any S.
+CURVE_HALF_WIDTH = 50
+CURVE_BLOCK = 256
+
+def cached_option_greeks(S, K, T, r, sigma):
+    key = ("greeks", float(S), float(K), float(T), float(r), float(sigma))
+    return bs_cache.get_or_compute(
+        key,
+        lambda: black_scholes_chain(S, K, T, r, sigma)._asdict(),
+    )
+
+def curve_range(S):
+    lower = max(0, CURVE_BLOCK * math.floor((S - CURVE_HALF_WIDTH) / CURVE_BLOCK))
+    return lower, CURVE_BLOCK * math.ceil((S + CURVE_HALF_WIDTH) / CURVE_BLOCK)
+
+def cached_option_curves(K, T, r, sigma, price_range):
+    lower, upper = price_range
+
+    def compute():
+        stock_prices = np.arange(float(lower), upper + 1.0)
+        # At S = 0 the prices are exact (0 and the discounted strike); only Greeks that are not drawn are undefined.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chain = black_scholes_chain(stock_prices, K, T, r, sigma)
+        return stock_prices, chain.call, chain.put
+
+    key = ("curves", float(K), float(T), float(r), float(sigma), int(lower), int(upper))
+    return bs_cache.get_or_compute(key, compute)
+
+def cached_mc_price(S, K, T, r, sigma, **kwargs):
+    key = ("mc", float(S), float(K), float(T), float(r), float(sigma)) + tuple(sorted(kwargs.items()))
+    return bs_cache.get_or_compute(key, lambda: price_option_mc(S, K, T, r, sigma, **kwargs))
+
+def cached_multi_asset(S, T, r, sigma, corr, payoff, K, option_type, num_paths, seed):
+    num_assets = corr.shape[0]
+    if payoff == "basket":
+        weights = np.full(num_assets, 1.0 / num_assets)
+        return cached_basket_price(S, sigma, corr, weights, K, T, r, option_type, num_paths, seed)
+    return cached_spread_price(S, sigma, corr, K, T, r, option_type, num_paths, seed)
+
+# Each section of the page is a stage of its own, so for example a new market
+# price only re-solves the implied volatility, a new S only moves the window
+# over the value curves, and a new multi-asset strike leaves the portfolio
+# distribution and its histogram alone.
+option_graph = ComputeGraph("option_pricing")
+
+@option_graph.stage("greeks", ["S", "K", "T", "r", "sigma"])
+def _greeks(S, K, T, r, sigma):
+    return cached_option_greeks(S, K, T, r, sigma)
+
+@option_graph.stage("implied_vol", ["market_price", "S", "K", "T", "r", "quote_type"])
+def _implied_vol(market_price, S, K, T, r, quote_type):
+    return implied_volatility(market_price, S, K, T, r, quote_type)
+
+@option_graph.stage("curves", ["K", "T", "r", "sigma", "curve_range"])
+def _curves(K, T, r, sigma, price_range):
+    return cached_option_curves(K, T, r, sigma, price_range)
+
+@option_graph.stage("curves_figure", ["curves", "S"])
+def _curves_figure(curves, S):
+    stock_prices, call_values, put_values = curves
+    window = (stock_prices >= S - CURVE_HALF_WIDTH) & (stock_prices <= S + CURVE_HALF_WIDTH)
+    stock_prices, call_values, put_values = stock_prices[window], call_values[window], put_values[window]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=stock_prices, y=call_values, mode='lines', name='Call Option'))
+    fig.add_trace(go.Scatter(x=stock_prices, y=put_values, mode='lines', name='Put Option'))
+    fig.add_trace(go.Scatter(x=[S, S], y=[0, max(max(call_values), max(put_values))], mode='lines', name='Current Stock Price', line=dict(dash='dash')))
+    
+    fig.update_layout(
+        title="Option Values vs. Stock Price",
+        xaxis_title="Stock Price",
+        yaxis_title="Option Value",
+        legend_title="Option Type"
+    )
+    return fig
+
+@option_graph.stage("monte_carlo", ["S", "K", "T", "r", "sigma", "mc_options"])
+def _monte_carlo(S, K, T, r, sigma, mc_options):
+    return cached_mc_price(S, K, T, r, sigma, **mc_options)
+
+@option_graph.stage("correlation", ["num_assets", "rho"])
+def _correlation(num_assets, rho):
+    return constant_correlation(num_assets, rho)
 
-def black_scholes_call(S, K, T, r, sigma):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    return S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+@option_graph.stage("multi_asset", ["S", "T", "r", "sigma", "correlation", "basket_payoff", "basket_strike",
+                                    "basket_type", "basket_paths"])
+def _multi_asset(S, T, r, sigma, corr, payoff, K, option_type, num_paths):
+    return cached_multi_asset(S, T, r, sigma, corr, payoff, K, option_type, num_paths, 42)
 
-def black_scholes_put(S, K, T, r, sigma):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    return K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+@option_graph.stage("portfolio", ["S", "r", "sigma", "correlation", "T", "basket_paths"])
+def _portfolio(S, r, sigma, corr, T, num_paths):
+    return cached_portfolio_distribution(S, r, sigma, corr, np.ones(corr.shape[0]), T, num_paths, 42)
+
+@option_graph.stage("portfolio_figure", ["portfolio", "num_assets"])
+def _portfolio_figure(portfolio, num_assets):
+    # Binned here so only 100 bars, not every scenario, are sent to the browser.
+    counts, edges = np.histogram(portfolio.values, bins=100)
+    fig = go.Figure(go.Bar(x=0.5 * (edges[:-1] + edges[1:]), y=counts, width=np.diff(edges), name="Terminal value"))
+    fig.add_vline(x=portfolio.initial_value - portfolio.value_at_risk, line_dash="dash",
+                  annotation_text="95% VaR")
+    fig.update_layout(title=f"Terminal value of one share of each of the {num_assets} assets",
+                      xaxis_title="Portfolio value", yaxis_title="Scenarios", showlegend=False)
+    return fig
+
+def warm_up():
+    # Widget defaults; the Monte Carlo keyword arguments must match the page's
+    # call exactly to share its cache key.
+    cached_option_greeks(100.0, 100.0, 1.0, 0.05, 0.2)
+    cached_option_curves(100.0, 1.0, 0.05, 0.2, curve_range(100.0))
+    cached_mc_price(100.0, 100.0, 1.0, 0.05, 0.2, option_type="call", style="european", barrier=None,
+                    barrier_type="down-and-out", dt=0.01, num_paths=10_000, antithetic=False,
+                    control_variate=False, sampler="pseudo", seed=42, backend="matrix", monitoring_dt=None)
+    corr = constant_correlation(10, 0.5)
+    cached_multi_asset(100.0, 1.0, 0.05, 0.2, corr, "basket", 100.0, "call", 100_000, 42)
+    cached_portfolio_distribution(100.0, 0.05, 0.2, corr, np.ones(10), 1.0, 100_000, 42)
 
 def run_option_pricing():
     st.header("Option Pricing with Black-Scholes Model")
@@ -53,31 +190,39 @@ def run_option_pricing():
         r = st.number_input("Risk-free rate (r)", min_value=0.0, max_value=0.2, value=0.05, step=0.01)
         sigma = st.number_input("Volatility (σ)", min_value=0.01, max_value=1.0, value=0.2, step=0.01)
     
-    call_price = black_scholes_call(S, K, T, r, sigma)
-    put_price = black_scholes_put(S, K, T, r, sigma)
+    graph = option_graph.run(option_graph.state(st.session_state),
+                             dict(S=S, K=K, T=T, r=r, sigma=sigma, curve_range=curve_range(S)))
+    greeks = graph["greeks"]
+    call_price, put_price = float(greeks["call"]), float(greeks["put"])
     
     st.markdown(f"### Option Prices")
     st.write(f"Call Option Price: ${call_price:.2f}")
     st.write(f"Put Option Price: ${put_price:.2f}")
     
-    # Create a range of stock prices to plot option values
-    stock_prices = np.linspace(max(0, S - 50), S + 50, 100)
-    call_values = [black_scholes_call(s, K, T, r, sigma) for s in stock_prices]
-    put_values = [black_scholes_put(s, K, T, r, sigma) for s in stock_prices]
+    st.markdown("### Greeks")
+    st.table({
+        "Greek": ["Delta", "Gamma", "Vega", "Theta (per year)", "Rho", "Vanna", "Vomma", "Charm (per year)", "Veta (per year)"],
+        "Call": [float(greeks[k]) for k in ("delta_call", "gamma", "vega", "theta_call", "rho_call", "vanna", "vomma", "charm", "veta")],
+        "Put": [float(greeks[k]) for k in ("delta_put", "gamma", "vega", "theta_put", "rho_put", "vanna", "vomma", "charm", "veta")],
+    })
     
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=stock_prices, y=call_values, mode='lines', name='Call Option'))
-    fig.add_trace(go.Scatter(x=stock_prices, y=put_values, mode='lines', name='Put Option'))
-    fig.add_trace(go.Scatter(x=[S, S], y=[0, max(max(call_values), max(put_values))], mode='lines', name='Current Stock Price', line=dict(dash='dash')))
+    st.markdown("### Implied Volatility")
+    col1, col2 = st.columns(2)
+    with col1:
+        quote_type = st.selectbox("Quoted option", ["call", "put"], key="iv_option_type")
+    with col2:
+        market_price = st.number_input("Market price", min_value=0.0, value=round(call_price, 2), step=0.1)
+    graph.update(market_price=market_price, quote_type=quote_type)
+    iv = graph["implied_vol"]
+    if iv.converged.item():
+        st.write(f"Implied volatility: {iv.iv.item():.2%} (solved in {iv.iterations.item()} iterations)")
+    else:
+        st.write(f"No implied volatility: {IV_FAILURES[iv.status.item()]}.")
     
-    fig.update_layout(
-        title="Option Values vs. Stock Price",
-        xaxis_title="Stock Price",
-        yaxis_title="Option Value",
-        legend_title="Option Type"
-    )
+    fig = graph["curves_figure"]
     
-    st.plotly_chart(fig, use_container_width=True)
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("""
     ### Interpretation
@@ -88,3 +233,116 @@ def run_option_pricing():
     - Higher volatility (σ) generally increases option prices due to greater uncertainty.
     - Longer time to maturity (T) typically increases option values due to more time for favorable price movements.
     """)
+    
+    st.markdown("""
+    ### Monte Carlo Pricing
+    The same option can be priced by simulating GBM paths under the risk-neutral drift $r$ and averaging the
+    discounted payoffs. Simulation also prices path-dependent payoffs that have no simple closed form:
+    - **Asian**: the payoff uses the arithmetic average price over the monitoring dates.
+    - **Barrier**: the option is knocked in or out when the path crosses the barrier level. The barrier can be
+      checked exactly once a trading day or continuously, whatever the time step: between simulated dates,
+      only paths close to the barrier get Brownian-bridge draws. Daily and continuous barriers have different
+      prices, since a daily check misses crossings that reverse within the day.
+    
+    Variance reduction lowers the standard error for the same number of paths:
+    - **Antithetic variates** pair every path with its mirror image $-Z$.
+    - **Control variate** uses the European option with the same strike, whose Black-Scholes price is known exactly.
+    - **Sobol** replaces pseudo-random draws with scrambled quasi-random points.
+    
+    The **fused path kernel** simulates each path and accumulates its payoff in one pass without storing the path,
+    which makes millions of barrier or Asian paths affordable. It draws its own pseudo-random numbers, so its
+    estimates differ from the default simulation by sampling noise.
+    """)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        option_type = st.selectbox("Option type", ["call", "put"])
+        style = st.selectbox("Payoff style", ["european", "asian", "barrier"])
+        if style == "barrier":
+            barrier_type = st.selectbox("Barrier type", list(BARRIER_TYPES), index=1)
+            barrier = st.number_input("Barrier level", min_value=1.0, value=80.0, step=1.0)
+            monitoring = st.selectbox("Barrier monitoring", list(MONITORING_CHOICES))
+        else:
+            barrier_type, barrier, monitoring = "down-and-out", None, "Simulation grid"
+    
+    with col2:
+        num_paths = st.number_input("Number of paths", min_value=100, max_value=10_000_000, value=10_000, step=1000)
+        mc_dt = st.number_input("Monitoring step (dt)", min_value=0.001, max_value=0.1, value=0.01, step=0.001)
+        mc_seed = st.number_input("Random seed", min_value=0, value=42, step=1)
+    
+    with col3:
+        antithetic = st.checkbox("Antithetic variates")
+        control_variate = st.checkbox("Black-Scholes control variate")
+        sampler = "sobol" if st.checkbox("Sobol quasi-random normals") else "pseudo"
+        fused = st.checkbox("Fused path kernel" + (" (Numba)" if HAVE_NUMBA else " (NumPy)"))
+        if fused and sampler == "sobol":
+            st.caption("The fused kernel only draws pseudo-random normals; Sobol runs on full paths.")
+        backend = "fused" if fused and sampler == "pseudo" else "matrix"
+        monitoring_dt = MONITORING_CHOICES[monitoring]
+        if monitoring_dt is not None and backend != "matrix":
+            st.caption("Bridge monitoring runs on full paths, not the fused kernel.")
+            backend = "matrix"
+        if backend == "matrix" and num_paths > MATRIX_MAX_PATHS:
+            st.caption(f"Full-path simulation keeps every payoff, so it is capped at {MATRIX_MAX_PATHS:,} paths.")
+            num_paths = MATRIX_MAX_PATHS
+        target_error = st.number_input("Target standard error", min_value=0.0001, value=0.01, step=0.001, format="%.4f")
+    
+    graph.update(mc_options=dict(option_type=option_type, style=style, barrier=barrier, barrier_type=barrier_type,
+                                 dt=mc_dt, num_paths=int(num_paths), antithetic=antithetic,
+                                 control_variate=control_variate, sampler=sampler, seed=int(mc_seed),
+                                 backend=backend, monitoring_dt=monitoring_dt))
+    with st.spinner("Simulating paths..."):
+        result = graph["monte_carlo"]
+    
+    st.write(f"Monte Carlo {style} {option_type} price: ${result.price:.4f} ± {result.std_error:.4f} (standard error, {result.num_paths:,} paths, {result.num_steps} steps)")
+    if style == "european":
+        st.write(f"Black-Scholes price: ${call_price if option_type == 'call' else put_price:.4f}")
+    if result.std_error > EXACT_STD_ERROR:
+        st.write(f"Paths needed for a standard error of {target_error:.4f}: {paths_for_precision(result.std_error, result.num_paths, target_error):,}")
+    elif result.std_error <= EXACT_STD_ERROR:
+        st.write("The control variate removes all sampling error for this payoff, so the estimate is exact.")
+    
+    st.markdown("""
+    ### Basket and Spread Options
+    With several assets, their Brownian motions are correlated through a correlation matrix $\\rho$. Independent
+    normal draws are combined with the Cholesky factor $L$ of $\\rho$ ($LL^T = \\rho$), so every simulated
+    scenario moves all assets together. Simulating each asset on its own ignores this co-movement and misprices
+    anything that depends on several assets at once.
+    - **Basket**: the payoff uses the equally weighted average of all asset prices at maturity.
+    - **Spread**: the payoff uses the difference between the first two assets at maturity.
+    
+    All assets start at $S$ with volatility $\\sigma$ and the same pairwise correlation.
+    """)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        basket_payoff = st.selectbox("Multi-asset payoff", ["basket", "spread"])
+        basket_type = st.selectbox("Multi-asset option type", ["call", "put"])
+    with col2:
+        num_assets = st.number_input("Number of assets", min_value=2, max_value=50, value=10, step=1)
+        rho = st.slider("Pairwise correlation (ρ)", -0.2, 1.0, 0.5, 0.05)
+    with col3:
+        basket_strike = st.number_input("Multi-asset strike", value=float(K) if basket_payoff == "basket" else 0.0, step=1.0)
+        basket_paths = st.number_input("Multi-asset paths", min_value=1000, max_value=2_000_000, value=100_000, step=10_000)
+    
+    # A constant correlation below -1/(n-1) is not a valid correlation matrix.
+    min_rho = -1.0 / (num_assets - 1)
+    if rho < min_rho:
+        st.warning(f"With {num_assets} assets the pairwise correlation must be at least {min_rho:.3f}.")
+        return
+    graph.update(num_assets=int(num_assets), rho=rho, basket_payoff=basket_payoff, basket_strike=basket_strike,
+                 basket_type=basket_type, basket_paths=int(basket_paths))
+    with st.spinner("Simulating correlated assets..."):
+        multi = graph["multi_asset"]
+    
+    st.write(f"Monte Carlo {basket_payoff} {basket_type} price: ${multi.price:.4f} ± {multi.std_error:.4f} (standard error, {multi.num_paths:,} paths)")
+    
+    portfolio = graph["portfolio"]
+    record_array("portfolio_values", portfolio.values)
+    fig = graph["portfolio_figure"]
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+    st.write(f"Initial value ${portfolio.initial_value:,.2f}; expected terminal value ${portfolio.mean:,.2f} "
+             f"(std ${portfolio.std:,.2f}); 95% VaR ${portfolio.value_at_risk:,.2f}, expected shortfall "
+             f"${portfolio.expected_shortfall:,.2f}; probability of a loss {portfolio.prob_loss:.1%}.")
@@ -2,19 +2,15 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
+from application_pages.parameter_sweep import cached_sweep_paths, cached_sweep_summary, parameter_grid
+from application_pages.instrumentation import record_array, stage
+from application_pages.path_rendering import DEFAULT_BAND_THRESHOLD, path_traces
 
-def simulate_gbm(S0, mu, sigma, T, dt, num_simulations):
-    num_steps = int(T / dt)
-    time_grid = np.linspace(0, T, num_steps)
-    dW = np.random.normal(0, np.sqrt(dt), (num_simulations, num_steps))
-    
-    S = np.zeros((num_simulations, num_steps))
-    S[:, 0] = S0
-    
-    for t in range(1, num_steps):
-        S[:, t] = S[:, t-1] * np.exp((mu - 0.5 * sigma**2) * dt + sigma * dW[:, t])
-    
-    return time_grid, S
+def warm_up():
+    # Widget defaults for both sections of the page.
+    cached_sweep_paths(100.0, [0.05, 0.1], [0.2, 0.3], 1.0, 0.01, 50, 42)
+    mus, sigmas = parameter_grid(np.linspace(-0.1, 0.3, 21), np.linspace(0.05, 0.6, 23))
+    cached_sweep_summary(100.0, mus, sigmas, 1.0, 20_000, 42, 0.95)
 
 def run_parameter_analysis():
     st.header("Parameter Analysis")
@@ -40,17 +36,20 @@ def run_parameter_analysis():
         sigma2 = st.number_input("Volatility 2 (σ2)", min_value=0.01, max_value=1.0, value=0.3, step=0.01)
     
     num_simulations = st.number_input("Number of simulations per set", min_value=1, max_value=1000, value=50, step=1)
+    seed = st.number_input("Random seed", min_value=0, value=42, step=1)
     
-    time_grid, S1 = simulate_gbm(S0, mu1, sigma1, T, dt, num_simulations)
-    _, S2 = simulate_gbm(S0, mu2, sigma2, T, dt, num_simulations)
-    
-    fig = go.Figure()
+    # Both sets are driven by the same Brownian draws, so differences between
+    # them come from the parameters rather than from sampling noise.
+    with stage("simulate"):
+        time_grid, S = cached_sweep_paths(S0, [mu1, mu2], [sigma1, sigma2], T, dt, num_simulations, seed)
+    S1, S2 = S[0], S[1]
+    record_array("paths", S)
     
-    for i in range(num_simulations):
-        fig.add_trace(go.Scatter(x=time_grid, y=S1[i, :], mode='lines', name=f'Set 1 - Sim {i+1}',
-                                 line=dict(color='blue', width=1), opacity=0.3))
-        fig.add_trace(go.Scatter(x=time_grid, y=S2[i, :], mode='lines', name=f'Set 2 - Sim {i+1}',
-                                 line=dict(color='red', width=1), opacity=0.3))
+    with stage("build_figure"):
+        fig = go.Figure(path_traces(time_grid, S1, 'Set 1', color='#0000ff', opacity=0.3)
+                        + path_traces(time_grid, S2, 'Set 2', color='#ff0000', opacity=0.3))
+    if num_simulations > DEFAULT_BAND_THRESHOLD:
+        st.caption(f"More than {DEFAULT_BAND_THRESHOLD} paths per set: showing 5%-95% and 25%-75% quantile bands and the median instead of individual paths.")
     
     fig.update_layout(
         title="Comparison of GBM Simulations with Different Parameters",
@@ -59,7 +58,8 @@ def run_parameter_analysis():
         showlegend=False
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    with stage("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("""
     ### Interpretation
@@ -71,4 +71,45 @@ def run_parameter_analysis():
     - Higher volatility results in wider spread and more extreme fluctuations in the paths.
     - The initial stock price (S0) sets the starting point for all paths.
     - The time horizon (T) determines how far into the future the simulation extends.
+    
+    Both sets reuse the same random draws (common random numbers), so the comparison isolates the effect of the parameters.
+    """)
+    
+    st.markdown("""
+    ### Parameter Grid
+    The sweep below evaluates a whole grid of drift and volatility values with one shared set of random draws.
+    For each pair it reports the expected terminal price, the Value at Risk (VaR) of holding one share bought at $S_0$,
+    and the probability of ending below $S_0$.
     """)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        mu_range = st.slider("Drift range (μ)", -1.0, 1.0, (-0.1, 0.3), 0.01)
+        num_mu = st.number_input("Drift grid points", min_value=2, max_value=100, value=21, step=1)
+    with col2:
+        sigma_range = st.slider("Volatility range (σ)", 0.01, 1.0, (0.05, 0.6), 0.01)
+        num_sigma = st.number_input("Volatility grid points", min_value=2, max_value=100, value=23, step=1)
+    with col3:
+        grid_paths = st.number_input("Paths per grid point", min_value=100, max_value=200_000, value=20_000, step=1000)
+        confidence = st.slider("VaR confidence", 0.80, 0.995, 0.95, 0.005)
+    
+    mu_values = np.linspace(mu_range[0], mu_range[1], int(num_mu))
+    sigma_values = np.linspace(sigma_range[0], sigma_range[1], int(num_sigma))
+    mus, sigmas = parameter_grid(mu_values, sigma_values)
+    
+    with stage("sweep"):
+        summary = cached_sweep_summary(S0, mus, sigmas, T, grid_paths, seed, confidence)
+    
+    surfaces = [
+        ("Expected terminal price", summary.expected_terminal),
+        (f"{confidence:.1%} VaR (loss per share)", summary.value_at_risk),
+        ("Probability of loss", summary.prob_loss),
+    ]
+    for (title, values), col in zip(surfaces, st.columns(3)):
+        with stage("build_figure"):
+            heatmap = go.Figure(go.Heatmap(x=sigma_values, y=mu_values, z=values.reshape(len(mu_values), len(sigma_values)),
+                                           colorscale="Viridis"))
+            heatmap.update_layout(title=title, xaxis_title="Volatility (σ)", yaxis_title="Drift (μ)")
+        with col, stage("plotly_chart"):
+            st.plotly_chart(heatmap, use_container_width=True)
@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+import numpy as np
+from application_pages.gbm_engine import brownian_paths, gbm_cache, gbm_time_grid
+
+SweepSummary = namedtuple(
+    "SweepSummary",
+    ["mus", "sigmas", "expected_terminal", "std_terminal", "value_at_risk", "expected_shortfall", "prob_loss"],
+)
+
+# Upper bound on each (parameter sets, paths) block of the summary sweep; the
+# summary's scratch arrays are the same size again.
+SWEEP_BLOCK_BYTES = 64 * 1024**2
+
+def parameter_grid(mus, sigmas):
+    # Full mu x sigma grid flattened to parameter sets, mu-major.
+    mu_grid, sigma_grid = np.meshgrid(np.asarray(mus, dtype=np.float64), np.asarray(sigmas, dtype=np.float64), indexing="ij")
+    return mu_grid.ravel(), sigma_grid.ravel()
+
+def sweep_paths(S0, mus, sigmas, T, dt, num_paths, seed, dtype=np.float64):
+    # Full paths for N parameter sets in one broadcasted pass:
+    # S_j(t) = S0 * exp((mu_j - sigma_j^2 / 2) t + sigma_j W(t)), shape (N, paths, steps).
+    # Every parameter set shares the same Brownian paths W (common random numbers).
+    mus = np.asarray(mus, dtype=dtype)
+    sigmas = np.asarray(sigmas, dtype=dtype)
+    time_grid = gbm_time_grid(T, dt)
+    _, W = brownian_paths(time_grid, num_paths, dtype=dtype, rng=np.random.default_rng(seed))
+    drift = ((mus - 0.5 * sigmas**2)[:, None] * time_grid.astype(dtype))[:, None, :]
+    S = sigmas[:, None, None] * W[None]
+    S += drift
+    np.exp(S, out=S)
+    S *= S0
+    return time_grid, S
+
+def sweep_terminal(S0, mus, sigmas, T, num_paths, seed):
+    # Terminal prices only need W(T), so N sets cost one vector of draws and a
+    # (N, paths) broadcast instead of N full path simulations.
+    W_T = np.sqrt(T) * np.random.default_rng(seed).standard_normal(num_paths)
+    return _terminal_from_brownian(S0, mus, sigmas, T, W_T)
+
+def _terminal_from_brownian(S0, mus, sigmas, T, W_T):
+    mus = np.asarray(mus, dtype=np.float64)
+    sigmas = np.asarray(sigmas, dtype=np.float64)
+    S_T = sigmas[:, None] * W_T[None, :]
+    S_T += ((mus - 0.5 * sigmas**2) * T)[:, None]
+    np.exp(S_T, out=S_T)
+    S_T *= S0
+    return S_T
+
+def summarize_terminal(S0, mus, sigmas, S_T, confidence=0.95):
+    # Risk figures are for a long position of one share bought at S0; VaR and
+    # expected shortfall are reported as positive losses.
+    losses = S0 - S_T
+    var = np.quantile(losses, confidence, axis=1)
+    tail = losses >= var[:, None]
+    shortfall = np.where(tail, losses, 0.0).sum(axis=1) / np.maximum(tail.sum(axis=1), 1)
+    return SweepSummary(
+        mus=np.asarray(mus, dtype=np.float64),
+        sigmas=np.asarray(sigmas, dtype=np.float64),
+        expected_terminal=S_T.mean(axis=1),
+        std_terminal=S_T.std(axis=1, ddof=1) if S_T.shape[1] > 1 else np.zeros(S_T.shape[0]),
+        value_at_risk=var,
+        expected_shortfall=shortfall,
+        prob_loss=(S_T < S0).mean(axis=1),
+    )
+
+def sweep_summary(S0, mus, sigmas, T, num_paths, seed, confidence=0.95, block_bytes=SWEEP_BLOCK_BYTES):
+    # Parameter sets are summarised a block at a time from the one vector of
+    # draws, so memory follows block_bytes rather than sets x paths.
+    mus = np.asarray(mus, dtype=np.float64)
+    sigmas = np.asarray(sigmas, dtype=np.float64)
+    W_T = np.sqrt(T) * np.random.default_rng(seed).standard_normal(num_paths)
+    rows = max(1, block_bytes // (8 * max(num_paths, 1)))
+    blocks = [
+        summarize_terminal(S0, mus[i:i + rows], sigmas[i:i + rows],
+                           _terminal_from_brownian(S0, mus[i:i + rows], sigmas[i:i + rows], T, W_T), confidence)
+        for i in range(0, max(len(mus), 1), rows)
+    ]
+    return SweepSummary(*(np.concatenate(field) for field in zip(*blocks)))
+
+def cached_sweep_paths(S0, mus, sigmas, T, dt, num_paths, seed):
+    key = ("sweep-paths", float(S0), tuple(map(float, mus)), tuple(map(float, sigmas)), float(T), float(dt),
+           int(num_paths), int(seed))
+    return gbm_cache.get_or_compute(key, lambda: sweep_paths(S0, mus, sigmas, T, dt, num_paths, seed))
+
+def cached_sweep_summary(S0, mus, sigmas, T, num_paths, seed, confidence=0.95):
+    key = ("sweep-summary", float(S0), tuple(map(float, mus)), tuple(map(float, sigmas)), float(T),
+           int(num_paths), int(seed), float(confidence))
+    return gbm_cache.get_or_compute(key, lambda: sweep_summary(S0, mus, sigmas, T, num_paths, seed, confidence))
@@ -0,0 +1,122 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# Roughly the width of a wide-layout chart in pixels; more points than this
+# per path cannot be told apart on screen.
+DEFAULT_MAX_POINTS = 800
+# Past this many paths the chart switches to quantile bands.
+DEFAULT_BAND_THRESHOLD = 200
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+PALETTE = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+           "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf")
+
+def lttb_indices(x, Y, max_points):
+    # Largest-Triangle-Three-Buckets, vectorised across paths: buckets are
+    # walked in order (each choice depends on the previous one) but every
+    # path is processed at once. Returns (num_paths, max_points) indices.
+    num_paths, n = Y.shape
+    if max_points >= n or max_points < 3:
+        return np.broadcast_to(np.arange(n), (num_paths, n))
+
+    edges = (np.arange(max_points - 1) * (n - 2) / (max_points - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    idx = np.empty((num_paths, max_points), dtype=np.int64)
+    idx[:, 0] = 0
+    idx[:, -1] = n - 1
+    rows = np.arange(num_paths)
+    a = np.zeros(num_paths, dtype=np.int64)
+
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x, avg_y = x[end:edges[i + 2]].mean(), Y[:, end:edges[i + 2]].mean(axis=1)
+        else:
+            avg_x, avg_y = x[n - 1], Y[:, n - 1]
+
+        x_a, y_a = x[a], Y[rows, a]
+        xs, ys = x[start:end], Y[:, start:end]
+        area = np.abs((x_a - avg_x)[:, None] * (ys - y_a[:, None])
+                      - (x_a[:, None] - xs) * (avg_y - y_a)[:, None])
+        a = start + area.argmax(axis=1)
+        idx[:, i + 1] = a
+    return idx
+
+def decimate_paths(time_grid, S, max_points=DEFAULT_MAX_POINTS):
+    idx = lttb_indices(time_grid, S, max_points)
+    return time_grid[idx], np.take_along_axis(S, idx, axis=1)
+
+def decimation_indices(time_grid, Y, max_points=DEFAULT_MAX_POINTS, max_traces=10):
+    # lttb_indices for each trace group path_display would draw.
+    num_traces = min(max_traces, Y.shape[0])
+    return [lttb_indices(time_grid, Y[k::num_traces], max_points) for k in range(num_traces)]
+
+def merged_path_trace(time_grid, S, name, color, max_points=DEFAULT_MAX_POINTS, width=1, opacity=1.0):
+    x, y = decimate_paths(time_grid, S, max_points)
+    return _merged_trace(x, y, name, color, width, opacity)
+
+def _merged_trace(x, y, name, color, width=1, opacity=1.0):
+    # One WebGL trace for many paths: rows are joined with a NaN gap so
+    # Plotly draws them as separate lines.
+    gap = np.full((x.shape[0], 1), np.nan)
+    return go.Scattergl(
+        x=np.hstack([x, gap]).ravel(),
+        y=np.hstack([y, gap]).ravel(),
+        mode='lines',
+        name=name,
+        line=dict(color=color, width=width),
+        opacity=opacity,
+        connectgaps=False,
+    )
+
+def band_traces(time_grid, bands, name, color, quantiles=DEFAULT_QUANTILES, max_points=DEFAULT_MAX_POINTS):
+    # bands holds one row per quantile in ascending order; pairs from the
+    # outside in are shaded, and the middle row (if any) is drawn as a line.
+    stride = max(1, int(np.ceil(len(time_grid) / max_points)))
+    keep = np.unique(np.append(np.arange(0, len(time_grid), stride), len(time_grid) - 1))
+    x = time_grid[keep]
+    rgb = tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+    traces = []
+    num_pairs = len(quantiles) // 2
+    for k in range(num_pairs):
+        lower, upper = bands[k][keep], bands[-1 - k][keep]
+        alpha = 0.15 + 0.2 * k
+        traces.append(go.Scatter(x=x, y=upper, mode='lines', line=dict(width=0), showlegend=False,
+                                 hoverinfo='skip', legendgroup=name))
+        traces.append(go.Scatter(x=x, y=lower, mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=f'rgba({rgb[0]}, {rgb[1]}, {rgb[2]}, {alpha:.2f})',
+                                 name=f'{name} {quantiles[k]:.0%}-{quantiles[-1 - k]:.0%}', legendgroup=name))
+    if len(quantiles) % 2:
+        traces.append(go.Scatter(x=x, y=bands[num_pairs][keep], mode='lines', line=dict(color=color),
+                                 name=f'{name} median', legendgroup=name))
+    return traces
+
+def path_display(time_grid, S, max_points=DEFAULT_MAX_POINTS, band_threshold=DEFAULT_BAND_THRESHOLD,
+                 quantiles=DEFAULT_QUANTILES, max_traces=10):
+    # The arrays path_traces draws, before any Plotly objects are built:
+    # ("bands", time_grid, bands) or ("paths", [(x, y), ...]) with one pair per
+    # trace. Both are linear in S, so rescaled paths only need y rescaled.
+    if S.shape[0] > band_threshold:
+        return "bands", time_grid, np.quantile(S, quantiles, axis=0)
+    num_traces = min(max_traces, S.shape[0])
+    return "paths", [decimate_paths(time_grid, S[k::num_traces], max_points) for k in range(num_traces)]
+
+def display_traces(display, name, color=None, scale=1.0, max_points=DEFAULT_MAX_POINTS,
+                   quantiles=DEFAULT_QUANTILES, **line_kwargs):
+    if display[0] == "bands":
+        _, time_grid, bands = display
+        return band_traces(time_grid, bands * scale, name, color or PALETTE[0], quantiles, max_points)
+    groups = display[1]
+    if color is not None:
+        return [_merged_trace(x, y * scale, name, color, **line_kwargs) for x, y in groups]
+    return [
+        _merged_trace(x, y * scale, f'{name} {k + 1}', PALETTE[k % len(PALETTE)], **line_kwargs)
+        for k, (x, y) in enumerate(groups)
+    ]
+
+def path_traces(time_grid, S, name, color=None, max_points=DEFAULT_MAX_POINTS,
+                band_threshold=DEFAULT_BAND_THRESHOLD, quantiles=DEFAULT_QUANTILES, max_traces=10, **line_kwargs):
+    # Few paths: a handful of merged, decimated WebGL traces. Many paths:
+    # per-timestep quantile bands, which stay the same size however many
+    # paths there are.
+    display = path_display(time_grid, S, max_points, band_threshold, quantiles, 1 if color is not None else max_traces)
+    return display_traces(display, name, color, 1.0, max_points, quantiles, **line_kwargs)
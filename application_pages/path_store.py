@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from application_pages.gbm_engine import gbm_time_grid
+from application_pages.gbm_streaming import iter_brownian_chunks
+
+# The store is opt-in: set QULAB_PATH_STORE to a directory shared by the app
+# processes (e.g. a mounted volume) to enable it.
+PATH_STORE_ENV = "QULAB_PATH_STORE"
+PATH_STORE_MAX_BYTES_ENV = "QULAB_PATH_STORE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 10 * 1024**3
+
+def brownian_key(T, dt, num_simulations, seed, dtype=np.float64):
+    # Brownian draws for any S0, mu and sigma; see gbm_paths_from_brownian.
+    params = dict(kind="brownian", T=float(T), dt=float(dt), num_simulations=int(num_simulations),
+                  seed=int(seed), dtype=np.dtype(dtype).str)
+    return _digest(params), params
+
+def _digest(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:32]
+
+class PathStore:
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES, chunk_size=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.root, key)
+        return base + ".npy", base + ".json"
+
+    def _lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def contains(self, key):
+        data_path, meta_path = self._paths(key)
+        return os.path.exists(data_path) and os.path.exists(meta_path)
+
+    def open(self, key):
+        # Zero-copy, read-only view; pages are read from disk only when sliced.
+        data_path, _ = self._paths(key)
+        S = np.load(data_path, mmap_mode="r")
+        # Touch the file so eviction sees it as recently used even on noatime
+        # mounts. A read-only shared mount cannot be touched (nor evicted from).
+        try:
+            os.utime(data_path, None)
+        except OSError:
+            pass
+        return S
+
+    def metadata(self, key):
+        with open(self._paths(key)[1]) as f:
+            return json.load(f)
+
+    def get_or_create_brownian(self, T, dt, num_simulations, seed, dtype=np.float64):
+        key, params = brownian_key(T, dt, num_simulations, seed, dtype)
+        chunks = lambda: iter_brownian_chunks(T, dt, num_simulations, chunk_size=self.chunk_size,
+                                              seed=seed, dtype=dtype)
+        return self._get_or_write(key, params, T, dt, num_simulations, dtype, chunks)
+
+    def max_paths(self, num_steps, dtype=np.float64):
+        # The most paths of num_steps dates that fit in the quota as one entry.
+        return self.max_bytes // (max(num_steps, 1) * np.dtype(dtype).itemsize)
+
+    def _get_or_write(self, key, params, T, dt, num_simulations, dtype, chunks):
+        time_grid = gbm_time_grid(T, dt)
+        # An entry larger than the whole quota would be written and then kept
+        # by evict(keep=key) regardless, so it is refused up front.
+        if num_simulations > self.max_paths(len(time_grid), dtype):
+            size = num_simulations * len(time_grid) * np.dtype(dtype).itemsize
+            raise ValueError(f"{size / 1024**2:,.0f} MiB of paths exceeds the path store quota of "
+                             f"{self.max_bytes / 1024**2:,.0f} MiB")
+        if not self.contains(key):
+            with self._lock(key):
+                if not self.contains(key):
+                    self._write(key, params, len(time_grid), num_simulations, dtype, chunks())
+                    self.evict(keep=key)
+        return time_grid, self.open(key)
+
+    def _write(self, key, params, num_steps, num_simulations, dtype, chunks):
+        # Paths are written chunk by chunk from a single generator, so the file
+        # holds exactly what brownian_paths would return for the same seed while
+        # memory stays bounded by one chunk. The file only appears under its
+        # final name once complete, so readers never see a partial store.
+        data_path, meta_path = self._paths(key)
+        tmp_path = f"{data_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(num_simulations, num_steps))
+        try:
+            row = 0
+            for _, S in chunks:
+                out[row:row + S.shape[0]] = S
+                row += S.shape[0]
+            out.flush()
+            del out
+            os.replace(tmp_path, data_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        meta = dict(params, shape=[num_simulations, num_steps], created=time.time())
+        tmp_meta = meta_path + ".tmp"
+        with open(tmp_meta, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+    def entries(self):
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((max(st.st_atime, st.st_mtime), st.st_size, name[:-4]))
+        return entries
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        # LRU under the disk quota. Open memmaps stay valid after unlink on
+        # POSIX, so sessions still reading an evicted entry are unaffected.
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            evicted.append(key)
+        return evicted
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def default_path_store():
+    global _default_store
+    root = os.environ.get(PATH_STORE_ENV)
+    if not root:
+        return None
+    with _default_store_lock:
+        if _default_store is None or _default_store.root != root:
+            max_bytes = int(os.environ.get(PATH_STORE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+            _default_store = PathStore(root, max_bytes=max_bytes)
+        return _default_store
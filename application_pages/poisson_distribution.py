@@ -2,7 +2,8 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
-from scipy import stats
+from application_pages.distribution_tables import cached_poisson_table
+from application_pages.instrumentation import stage
 
 def run_poisson_distribution():
     st.header("Poisson Distribution")
@@ -23,10 +24,16 @@ def run_poisson_distribution():
     Let's explore how changing the lambda parameter affects the shape of the distribution!
     ''')
     
-    lambda_param = st.slider("Average number of events (λ)", 0.1, 20.0, 5.0, 0.1)
+    lambda_param = st.slider("Average number of events (λ)", 0.1, 1000.0, 5.0, 0.1)
     
-    x = np.arange(0, int(lambda_param * 3) + 1)  # Adjust range based on lambda
-    y = stats.poisson.pmf(x, lambda_param)
+    # One table per λ serves the chart and every probability below.
+    with stage("distribution_table"):
+        table = cached_poisson_table(lambda_param)
+    if int(lambda_param * 3) + 1 <= 200:
+        x = np.arange(0, min(int(lambda_param * 3), table.k_max) + 1)  # Adjust range based on lambda
+        y = table.pmf[x]
+    else:
+        x, y = table.display_range()
     
     fig = go.Figure()
     fig.add_trace(go.Bar(x=x, y=y, name='PMF'))
@@ -59,9 +66,9 @@ def run_poisson_distribution():
     # Calculate probabilities
     k = st.number_input("Enter a number of events (k) to calculate probabilities:", min_value=0, value=min(5, int(lambda_param)), step=1)
     
-    exact_prob = stats.poisson.pmf(k, lambda_param)
-    less_than_prob = stats.poisson.cdf(k, lambda_param)
-    greater_than_prob = 1 - stats.poisson.cdf(k-1, lambda_param)
+    exact_prob = table.pmf_at(k)
+    less_than_prob = table.cdf_at(k)
+    greater_than_prob = table.sf_at(k)
     
     st.write(f"Probability of exactly {k} events: {exact_prob:.4f}")
     st.write(f"Probability of {k} or fewer events: {less_than_prob:.4f}")
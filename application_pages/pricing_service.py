@@ -0,0 +1,218 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from application_pages.headless import CONTRACT_COLUMNS, QUOTE_COLUMNS, implied_vol_contracts, price_contracts
+
+# A small local HTTP/JSON front end for the pricing kernels. Each request is
+# handled on its own thread, but the pricing itself goes through one batcher
+# thread: requests that arrive within max_wait of each other are concatenated
+# into a single vectorised kernel call and the results are split back out.
+#
+#   POST /price        {"S": 100, "K": [90, 100, 110], "T": 1, "r": 0.05, "sigma": 0.2, "option_type": "call"}
+#   POST /implied_vol  {"price": 10.45, "S": 100, "K": 100, "T": 1, "r": 0.05}
+#   GET  /health, GET /stats
+#
+# Fields may be scalars or equal-length lists. A body of the form
+# {"contracts": [{...}, {...}]} gets a list of per-contract objects back.
+
+KERNELS = {
+    "price": (CONTRACT_COLUMNS, price_contracts),
+    "implied_vol": (QUOTE_COLUMNS, implied_vol_contracts),
+}
+
+class _Request:
+    def __init__(self, kind, columns, option_type, size):
+        self.kind = kind
+        self.columns = columns
+        self.option_type = option_type
+        self.size = size
+        self.future = Future()
+
+class PricingBatcher:
+    def __init__(self, max_batch=100_000, max_wait=0.002):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self.contracts = 0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="qulab-pricing-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, fields):
+        # fields: name -> scalar or 1-d array. Returns a Future of a dict of arrays.
+        names, _ = KERNELS[kind]
+        missing = [name for name in names if name not in fields]
+        if missing:
+            raise ValueError(f"Missing field(s): {', '.join(missing)}")
+        values = [np.asarray(fields[name], dtype=np.float64) for name in names]
+        option_type = np.asarray(fields.get("option_type", "call"), dtype=object)
+        try:
+            values = np.broadcast_arrays(*values, option_type)
+        except ValueError:
+            raise ValueError("Fields must be scalars or lists of the same length") from None
+        columns = [np.ravel(v) for v in values[:-1]]
+        request = _Request(kind, columns, np.ravel(values[-1]), columns[0].size)
+        self._queue.put(request)
+        return request.future
+
+    def price(self, fields, timeout=None):
+        return self.submit("price", fields).result(timeout)
+
+    def implied_vol(self, fields, timeout=None):
+        return self.submit("implied_vol", fields).result(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            return {"batches": self.batches, "requests": self.requests, "contracts": self.contracts,
+                    "max_batch": self.max_batch, "max_wait_s": self.max_wait}
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        # Waits up to max_wait after the first request for more to arrive.
+        batch, size = [first], first.size
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+            size += request.size
+        return batch
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            for kind in KERNELS:
+                group = [request for request in batch if request.kind == kind]
+                if group:
+                    self._run(kind, group)
+
+    def _run(self, kind, group):
+        _, kernel = KERNELS[kind]
+        try:
+            columns = [np.concatenate(parts) for parts in zip(*(request.columns for request in group))]
+            option_type = np.concatenate([request.option_type for request in group])
+            results = kernel(*columns, option_type)
+        except Exception:
+            # One bad request must not fail the others it was batched with.
+            for request in group:
+                self._run_alone(kernel, request)
+        else:
+            start = 0
+            for request in group:
+                stop = start + request.size
+                request.future.set_result({name: values[start:stop] for name, values in results.items()})
+                start = stop
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(group)
+            self.contracts += sum(request.size for request in group)
+
+    def _run_alone(self, kernel, request):
+        try:
+            request.future.set_result(kernel(*request.columns, request.option_type))
+        except Exception as exc:
+            request.future.set_exception(exc)
+
+def _json_value(values):
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        # JSON has no NaN or infinity.
+        return [float(v) if np.isfinite(v) else None for v in values]
+    return values.tolist()
+
+class PricingRequestHandler(BaseHTTPRequestHandler):
+    batcher = None
+    timeout_s = 30.0
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send(200, self.batcher.stats())
+        else:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        kind = self.path.strip("/")
+        if kind not in KERNELS:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            contracts = body.get("contracts") if isinstance(body, dict) else None
+            if contracts is not None:
+                if not isinstance(contracts, list) or not all(isinstance(c, dict) for c in contracts):
+                    raise ValueError("contracts must be a list of JSON objects")
+                fields = {name: [contract.get(name) for contract in contracts] for name in KERNELS[kind][0]}
+                fields["option_type"] = [contract.get("option_type", "call") for contract in contracts]
+                fields = {name: values for name, values in fields.items() if None not in values}
+            elif isinstance(body, dict):
+                fields = body
+            else:
+                raise ValueError("Expected a JSON object")
+            results = self.batcher.submit(kind, fields).result(self.timeout_s)
+        except (ValueError, TypeError) as exc:
+            self._send(400, {"error": str(exc)})
+            return
+        except Exception as exc:
+            self._send(500, {"error": repr(exc)})
+            return
+
+        columns = {name: _json_value(values) for name, values in results.items()}
+        if contracts is not None:
+            self._send(200, {"results": [dict(zip(columns, row)) for row in zip(*columns.values())]})
+        else:
+            self._send(200, columns)
+
+    def log_message(self, format, *args):
+        pass
+
+class PricingServer(ThreadingHTTPServer):
+    # The socketserver default backlog of 5 resets connections under the very
+    # bursts of small requests that batching is meant for.
+    request_queue_size = 256
+    daemon_threads = True
+
+def make_server(host="127.0.0.1", port=8600, max_batch=100_000, max_wait=0.002):
+    handler = type("Handler", (PricingRequestHandler,), {"batcher": PricingBatcher(max_batch, max_wait)})
+    return PricingServer((host, port), handler)
+
+def serve(host="127.0.0.1", port=8600, max_batch=100_000, max_wait=0.002):
+    server = make_server(host, port, max_batch, max_wait)
+    print(f"Pricing service listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.batcher.close()
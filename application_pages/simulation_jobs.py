@@ -0,0 +1,137 @@
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from application_pages.gbm_engine import gbm_cache
+from application_pages.gbm_parallel import iter_parallel_stream_gbm_statistics, stream_cache_key
+
+# Background jobs keep heavy simulations off the Streamlit script thread. A
+# job runs a generator of (progress, partial_result) steps; it is deduplicated
+# by key across sessions, reference-counted by the sessions watching it, and
+# cancelled between steps once nobody is watching any more.
+
+RUNNING, DONE, CANCELLED, FAILED = "running", "done", "cancelled", "failed"
+
+class SimulationJob:
+    def __init__(self, key):
+        self.key = key
+        self.status = RUNNING
+        self.progress = 0.0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.subscribers = 0
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status != RUNNING
+
+    def snapshot(self):
+        with self._lock:
+            return self.status, self.progress, self.partial
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self, steps, on_done):
+        try:
+            # Cancellation is checked before each step is started, not after,
+            # so a job cancelled while still queued submits no work at all.
+            while True:
+                if self._cancel.is_set():
+                    steps.close()
+                    with self._lock:
+                        self.status = CANCELLED
+                    return
+                try:
+                    progress, partial = next(steps)
+                except StopIteration:
+                    break
+                with self._lock:
+                    self.progress, self.partial = progress, partial
+            with self._lock:
+                self.result, self.progress, self.status = self.partial, 1.0, DONE
+            on_done(self)
+        except Exception as exc:
+            with self._lock:
+                self.error, self.status = exc, FAILED
+
+class JobManager:
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qulab-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, make_steps, on_done=None):
+        # Identical in-flight requests share one job.
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.status in (CANCELLED, FAILED):
+                job = SimulationJob(key)
+                self._jobs[key] = job
+                self._executor.submit(job._run, make_steps(), lambda j: self._finish(j, on_done))
+            job.subscribers += 1
+            return job
+
+    def _finish(self, job, on_done):
+        if on_done is not None:
+            on_done(job)
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def release(self, job):
+        with self._lock:
+            job.subscribers -= 1
+            if job.subscribers <= 0 and not job.done:
+                job.cancel()
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._jobs)
+
+job_manager = JobManager()
+
+def track_session_job(session_state, slot, key, make_steps, on_done=None, manager=None):
+    # Keeps one job per session slot: a new key supersedes (and releases) the
+    # previous job, which is cancelled if no other session is watching it.
+    manager = manager or job_manager
+    current = session_state.get(slot)
+    if current is not None and current.key == key and current.status not in (CANCELLED, FAILED):
+        return current
+    if current is not None:
+        manager.release(current)
+    job = manager.submit(key, make_steps, on_done)
+    session_state[slot] = job
+    return job
+
+def stream_statistics_steps(S0, mu, sigma, T, dt, num_simulations, seed):
+    for done, total, stats in iter_parallel_stream_gbm_statistics(S0, mu, sigma, T, dt, num_simulations, seed):
+        # The merged stats keep being updated by later blocks; readers get a copy.
+        yield (done / total if total else 1.0), copy.deepcopy(stats)
+
+def submit_stream_statistics(session_state, sigma, T, dt, num_simulations, seed, slot="gbm_stream_job"):
+    # Returns (job, cached_result). Statistics are for S0 = 1 and mu = 0; use
+    # StreamingGBMStats.rescaled for other values, so changing either never
+    # starts a new job. Finished results go into gbm_cache under the same key
+    # as cached_parallel_stream_gbm_statistics, so reruns and other sessions
+    # pick them up without starting a job.
+    key = stream_cache_key(1.0, 0.0, sigma, T, dt, num_simulations, seed)
+    cached = gbm_cache.get(key)
+    if cached is not None:
+        previous = session_state.get(slot)
+        if previous is not None:
+            job_manager.release(previous)
+            session_state[slot] = None
+        return None, cached
+
+    job = track_session_job(
+        session_state, slot, key,
+        lambda: stream_statistics_steps(1.0, 0.0, sigma, T, dt, num_simulations, seed),
+        on_done=lambda j: gbm_cache.put(j.key, j.result),
+    )
+    return job, None
@@ -0,0 +1,90 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+# Pages are imported only when they are first opened, and SciPy's stats
+# package only when a page actually needs it. The warm-up below pays those
+# import costs, plus first-call costs in the kernels and Plotly, once per
+# process in a background thread so later sessions find them done. Set
+# QULAB_WARMUP=0 to disable it.
+WARMUP_ENV = "QULAB_WARMUP"
+
+WARMUP_PAGES = (
+    "application_pages.gbm_simulation",
+    "application_pages.parameter_analysis",
+    "application_pages.option_pricing",
+)
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+warmup_timings = []
+
+def warmup_enabled():
+    return os.environ.get(WARMUP_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+def _warm_kernels():
+    import numpy as np
+    import plotly.graph_objects as go
+    from application_pages.black_scholes import black_scholes_chain
+    from application_pages.gbm_engine import simulate_gbm
+    from application_pages.implied_vol import implied_volatility
+    from application_pages.mc_pricing import price_option_mc
+    from application_pages.path_rendering import lttb_indices
+
+    time_grid, S = simulate_gbm(100.0, 0.05, 0.2, 1.0, 0.01, 4, rng=np.random.default_rng(0))
+    lttb_indices(time_grid, S, 16)
+    black_scholes_chain(np.linspace(50.0, 150.0, 8), 100.0, 1.0, 0.05, 0.2)
+    implied_volatility(10.45, 100.0, 100.0, 1.0, 0.05)
+    price_option_mc(100.0, 100.0, 1.0, 0.05, 0.2, dt=0.1, num_paths=64, sampler="sobol", seed=0)
+    # Compiles the fused kernels when Numba is installed (cached on disk after
+    # the first process).
+    for style in ("european", "barrier"):
+        price_option_mc(100.0, 100.0, 1.0, 0.05, 0.2, style=style, barrier=80.0, dt=0.1, num_paths=64, seed=0,
+                        backend="fused")
+    # Plotly loads its validators the first time a figure is serialised.
+    go.Figure(go.Scattergl(x=[0, 1], y=[0, 1])).to_json()
+
+def warm_up(pages=WARMUP_PAGES):
+    # Runs each step in order and records how long it took. A failing step is
+    # recorded and skipped; warm-up must never take the app down.
+    steps = [("import " + name, lambda name=name: importlib.import_module(name)) for name in pages]
+    steps.append(("kernels", _warm_kernels))
+    for name in pages:
+        steps.append(("prefill " + name, lambda name=name: importlib.import_module(name).warm_up()))
+
+    timings = []
+    for label, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+            error = None
+        except Exception as exc:
+            error = repr(exc)
+        timings.append((label, time.perf_counter() - start, error))
+    warmup_timings[:] = timings
+    return timings
+
+def start_background_warmup():
+    # Idempotent: the first call in a process starts the thread, later calls
+    # return it.
+    global _warmup_thread
+    if not warmup_enabled():
+        return None
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up, name="qulab-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+def main():
+    start = time.perf_counter()
+    for label, seconds, error in warm_up():
+        status = "" if error is None else f"  FAILED: {error}"
+        print(f"{label:<50} {seconds * 1000:9.1f} ms{status}")
+    print(f"{'total':<50} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return 1 if any(error for _, _, error in warmup_timings) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
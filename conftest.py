@@ -0,0 +1,2 @@
+# Present so that pytest puts the repository root on sys.path and the tests can
+# import application_pages the way app.py does.
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from application_pages.black_scholes import black_scholes_call, black_scholes_chain, black_scholes_put
+
+S = np.array([70.0, 95.0, 100.0, 130.0])
+K, T, r, sigma = 100.0, 0.75, 0.04, 0.3
+
+def _central(f, x, h):
+    return (f(x + h) - f(x - h)) / (2 * h)
+
+def test_prices_match_the_closed_form_and_parity():
+    chain = black_scholes_chain(S, K, T, r, sigma)
+    np.testing.assert_allclose(chain.call, black_scholes_call(S, K, T, r, sigma), rtol=1e-12)
+    np.testing.assert_allclose(chain.put, black_scholes_put(S, K, T, r, sigma), rtol=1e-10, atol=1e-12)
+
+@pytest.mark.parametrize("name, f, x, h", [
+    ("delta_call", lambda s: black_scholes_chain(s, K, T, r, sigma).call, S, 1e-3),
+    ("delta_put", lambda s: black_scholes_chain(s, K, T, r, sigma).put, S, 1e-3),
+    ("gamma", lambda s: black_scholes_chain(s, K, T, r, sigma).delta_call, S, 1e-3),
+    ("vega", lambda v: black_scholes_chain(S, K, T, r, v).call, sigma, 1e-5),
+    ("vanna", lambda v: black_scholes_chain(S, K, T, r, v).delta_call, sigma, 1e-5),
+    ("vomma", lambda v: black_scholes_chain(S, K, T, r, v).vega, sigma, 1e-5),
+    ("rho_call", lambda q: black_scholes_chain(S, K, T, q, sigma).call, r, 1e-5),
+    ("rho_put", lambda q: black_scholes_chain(S, K, T, q, sigma).put, r, 1e-5),
+])
+def test_greeks_match_finite_differences(name, f, x, h):
+    np.testing.assert_allclose(getattr(black_scholes_chain(S, K, T, r, sigma), name), _central(f, x, h),
+                               rtol=1e-6, atol=1e-8)
+
+@pytest.mark.parametrize("name, value", [("theta_call", "call"), ("theta_put", "put"),
+                                         ("charm", "delta_call"), ("veta", "vega")])
+def test_time_greeks_are_per_year_of_calendar_time(name, value):
+    # d/dt = -d/dT.
+    f = lambda t: getattr(black_scholes_chain(S, K, t, r, sigma), value)
+    np.testing.assert_allclose(getattr(black_scholes_chain(S, K, T, r, sigma), name), -_central(f, T, 1e-6),
+                               rtol=1e-5, atol=1e-8)
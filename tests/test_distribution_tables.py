@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from scipy import stats
+from application_pages.distribution_tables import binomial_table, poisson_table
+
+def _assert_matches(table, dist):
+    k = table.support
+    pmf = dist.pmf(k)
+    # Relative error where the reference is representable, including far tails.
+    shown = pmf > 1e-280
+    np.testing.assert_allclose(table.pmf[shown], pmf[shown], rtol=1e-8)
+    np.testing.assert_allclose(table.cdf, dist.cdf(k), atol=1e-10)
+    # Mass beyond k_max is dropped, which costs the upper tail its relative
+    # precision only within a few points of the end of the table.
+    sf = dist.sf(k)
+    tail = (sf > 1e-280) & (sf > 1e8 * dist.sf(table.k_max))
+    np.testing.assert_allclose(table.sf[tail], sf[tail], rtol=1e-8)
+
+@pytest.mark.parametrize("n, p", [(1, 0.5), (20, 0.3), (1_000, 0.01), (100_000, 0.5), (50_000, 0.999)])
+def test_binomial_table_matches_scipy(n, p):
+    _assert_matches(binomial_table(n, p), stats.binom(n, p))
+
+@pytest.mark.parametrize("lam", [0.5, 20.0, 5_000.0])
+def test_poisson_table_matches_scipy(lam):
+    table = poisson_table(lam)
+    _assert_matches(table, stats.poisson(lam))
+    # The table stops where the remaining mass is below double precision.
+    assert stats.poisson(lam).sf(table.k_max) < 1e-15
+
+def test_degenerate_binomial():
+    table = binomial_table(5, 1.0)
+    assert table.pmf_at(5) == 1.0 and table.cdf_at(4) == 0.0 and table.sf_at(4) == 1.0
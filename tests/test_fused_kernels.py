@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from application_pages.fused_kernels import HAVE_NUMBA, iter_fused_payoffs
+
+CASES = [
+    dict(style="european"),
+    dict(style="asian", option_type="put"),
+    dict(style="barrier", barrier=90.0, barrier_type="down-and-out"),
+    dict(style="barrier", barrier=120.0, barrier_type="up-and-in", antithetic=True),
+]
+
+def _fused(backend, chunk_size=1_000_000, **kwargs):
+    chunks = iter_fused_payoffs(100.0, 100.0, 1.0, 0.05, 0.2, 50, 2_000, seed=7, chunk_size=chunk_size,
+                                backend=backend, **kwargs)
+    payoffs, controls = zip(*[(p.copy(), c.copy()) for p, c in chunks])
+    return np.concatenate(payoffs), np.concatenate(controls)
+
+@pytest.mark.skipif(not HAVE_NUMBA, reason="Numba is not installed")
+@pytest.mark.parametrize("case", CASES)
+def test_fused_backends_agree(case):
+    # Both kernels read the same counter-based draws, so they differ only by
+    # floating-point rounding.
+    for numba_out, numpy_out in zip(_fused("numba", **case), _fused("numpy", **case)):
+        np.testing.assert_allclose(numba_out, numpy_out, rtol=1e-9, atol=1e-12)
+
+@pytest.mark.parametrize("case", CASES)
+def test_fused_payoffs_do_not_depend_on_chunking(case):
+    for whole, chunked in zip(_fused("numpy", **case), _fused("numpy", chunk_size=333, **case)):
+        np.testing.assert_array_equal(whole, chunked)
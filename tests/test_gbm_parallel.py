@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from application_pages.gbm_parallel import parallel_simulate_gbm, parallel_stream_gbm_statistics, shutdown_executor
+
+@pytest.fixture(scope="module", autouse=True)
+def executor():
+    yield
+    shutdown_executor()
+
+def test_parallel_paths_do_not_depend_on_workers():
+    args = (100.0, 0.05, 0.2, 1.0, 0.01, 2_500, 11)
+    time_grid, serial = parallel_simulate_gbm(*args, block_size=400, max_workers=1)
+    _, pooled = parallel_simulate_gbm(*args, block_size=400, max_workers=3)
+    assert serial.shape == (2_500, len(time_grid))
+    np.testing.assert_array_equal(serial, pooled)
+
+def test_parallel_stream_statistics_do_not_depend_on_workers():
+    args = (100.0, 0.05, 0.2, 1.0, 0.01, 5_000, 11)
+    serial = parallel_stream_gbm_statistics(*args, block_size=700, max_workers=1)
+    pooled = parallel_stream_gbm_statistics(*args, block_size=700, max_workers=3)
+    assert serial.count == pooled.count == 5_000
+    np.testing.assert_array_equal(serial.counts, pooled.counts)
+    np.testing.assert_array_equal(serial.mean, pooled.mean)
+    np.testing.assert_array_equal(serial.std, pooled.std)
@@ -0,0 +1,34 @@
+import numpy as np
+from application_pages.black_scholes import black_scholes_chain
+from application_pages.implied_vol import CONVERGED, FLAT_VEGA, MAX_ITER, OUT_OF_BOUNDS, implied_volatility
+
+def test_round_trip_over_a_chain():
+    S, T, r = 100.0, np.array([[0.1], [1.0], [3.0]]), 0.03
+    K = np.linspace(60.0, 160.0, 11)
+    sigma = np.array([[0.1], [0.35], [0.8]])
+    chain = black_scholes_chain(S, K, T, r, sigma)
+    expected = np.broadcast_to(sigma, chain.call.shape)
+    for price, option_type in ((chain.call, "call"), (chain.put, "put")):
+        result = implied_volatility(price, S, K, T, r, option_type)
+        # Far out-of-the-money short-dated quotes carry too little vega to pin down.
+        solvable = np.broadcast_to(chain.vega, price.shape) > 1e-6
+        assert result.converged[solvable].all()
+        np.testing.assert_allclose(result.iv[solvable], expected[solvable], rtol=1e-7)
+
+def test_output_keeps_the_broadcast_input_shape():
+    scalar = implied_volatility(10.45, 100.0, 100.0, 1.0, 0.05)
+    assert scalar.iv.shape == scalar.converged.shape == scalar.iterations.shape == ()
+    assert abs(scalar.iv - 0.2) < 1e-3
+
+    prices = black_scholes_chain(100.0, [[90.0, 100.0], [110.0, 120.0]], 1.0, 0.05, 0.2).call
+    prices[1, 1] = 1e6
+    grid = implied_volatility(prices, 100.0, [[90.0, 100.0], [110.0, 120.0]], 1.0, 0.05)
+    assert grid.iv.shape == grid.converged.shape == grid.iterations.shape == (2, 2)
+    assert grid.converged.tolist() == [[True, True], [True, False]]
+    assert np.isnan(grid.iv[1, 1])
+
+def test_status_says_why_a_quote_failed():
+    # Above the stock price, a far out-of-the-money quote priced below rounding, and a capped solve.
+    result = implied_volatility([10.45, 120.0, 1e-300], 100.0, [100.0, 100.0, 200.0], [1.0, 1.0, 0.01], 0.05)
+    assert result.status.tolist() == [CONVERGED, OUT_OF_BOUNDS, FLAT_VEGA]
+    assert implied_volatility(10.45, 100.0, 100.0, 1.0, 0.05, tol=1e-15, max_iter=1).status == MAX_ITER
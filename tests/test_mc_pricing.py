@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from scipy.special import ndtr
+from application_pages.black_scholes import black_scholes_call, black_scholes_put
+from application_pages.mc_pricing import paths_for_precision, price_option_mc
+
+S0, K, T, r, sigma = 100.0, 105.0, 1.0, 0.03, 0.25
+
+@pytest.mark.parametrize("option_type", ["call", "put"])
+@pytest.mark.parametrize("options", [
+    dict(),
+    dict(antithetic=True),
+    dict(sampler="sobol"),
+    dict(backend="numpy"),
+    dict(backend="numpy", antithetic=True),
+])
+def test_european_price_matches_black_scholes(option_type, options):
+    exact = (black_scholes_call if option_type == "call" else black_scholes_put)(S0, K, T, r, sigma)
+    result = price_option_mc(S0, K, T, r, sigma, option_type, dt=0.25, num_paths=100_000, seed=3, **options)
+    assert result.std_error > 0
+    assert abs(result.price - exact) < 4 * result.std_error
+
+def test_control_variate_is_exact_for_european_payoffs():
+    # The control is the payoff itself, so the estimator collapses onto Black-Scholes.
+    result = price_option_mc(S0, K, T, r, sigma, dt=0.25, num_paths=10_000, seed=3, control_variate=True)
+    assert result.control_beta == pytest.approx(1.0)
+    assert result.price == pytest.approx(black_scholes_call(S0, K, T, r, sigma), rel=1e-12)
+
+def test_prices_do_not_depend_on_chunk_size():
+    whole = price_option_mc(S0, K, T, r, sigma, style="asian", num_paths=5_000, seed=3, antithetic=True)
+    chunked = price_option_mc(S0, K, T, r, sigma, style="asian", num_paths=5_000, seed=3, antithetic=True,
+                              chunk_size=123)
+    assert whole == chunked
+
+def test_paths_for_precision_scales_with_inverse_square():
+    assert paths_for_precision(0.02, 10_000, 0.01) == 40_000
+    with pytest.raises(ValueError):
+        paths_for_precision(0.02, 10_000, 0.0)
+
+def _down_and_out_call(S, K, T, r, sigma, H):
+    # Reiner-Rubinstein, barrier H below the strike, no rebate.
+    lam = (r + 0.5 * sigma**2) / sigma**2
+    vol = sigma * np.sqrt(T)
+    y = np.log(H**2 / (S * K)) / vol + lam * vol
+    down_and_in = (S * (H / S) ** (2 * lam) * ndtr(y)
+                   - K * np.exp(-r * T) * (H / S) ** (2 * lam - 2) * ndtr(y - vol))
+    return black_scholes_call(S, K, T, r, sigma) - down_and_in
+
+@pytest.mark.parametrize("dt", [0.1, 0.25])
+def test_continuous_barrier_matches_closed_form(dt):
+    # The bridge makes the price independent of the simulation grid.
+    result = price_option_mc(S0, K, T, r, sigma, style="barrier", barrier=85.0, barrier_type="down-and-out",
+                             dt=dt, num_paths=200_000, seed=5, monitoring_dt=0.0,
+                             control_variate=True)
+    exact = _down_and_out_call(S0, K, T, r, sigma, 85.0)
+    assert abs(result.price - exact) < 4 * result.std_error
+
+def test_daily_barrier_matches_shifted_closed_form():
+    # Broadie-Glasserman-Kou: monitoring every dt is continuous monitoring of a
+    # barrier moved away from S0 by exp(-0.5826 sigma sqrt(dt)).
+    monitoring_dt = 1 / 252
+    result = price_option_mc(S0, K, T, r, sigma, style="barrier", barrier=85.0, barrier_type="down-and-out",
+                             dt=0.1, num_paths=200_000, seed=5, monitoring_dt=monitoring_dt,
+                             control_variate=True)
+    shifted = 85.0 * np.exp(-0.5826 * sigma * np.sqrt(monitoring_dt))
+    exact = _down_and_out_call(S0, K, T, r, sigma, shifted)
+    assert abs(result.price - exact) < 4 * result.std_error
+    # Daily monitoring misses crossings between dates, so the knock-out is cheaper to survive.
+    assert result.price > _down_and_out_call(S0, K, T, r, sigma, 85.0) + 4 * result.std_error
@@ -0,0 +1,39 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from application_pages.pricing_service import make_server
+
+@pytest.fixture(scope="module")
+def url():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def _post(url, path, body):
+    request = urllib.request.Request(url + path, data=json.dumps(body).encode(), method="POST",
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+def test_contracts_are_priced_one_object_each(url):
+    contract = dict(S=100.0, K=100.0, T=1.0, r=0.05, sigma=0.2)
+    status, body = _post(url, "/price", {"contracts": [contract, dict(contract, option_type="put")]})
+    assert status == 200
+    call, put = body["results"]
+    assert call["price"] == pytest.approx(10.4506, abs=1e-4)
+    assert put["price"] == pytest.approx(5.5735, abs=1e-4)
+
+@pytest.mark.parametrize("contracts", [[1, 2], ["S=100"], {"S": 100.0}, "S=100"])
+def test_malformed_contracts_are_rejected(url, contracts):
+    status, body = _post(url, "/price", {"contracts": contracts})
+    assert status == 400
+    assert "contracts" in body["error"]